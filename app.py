@@ -5,6 +5,7 @@ import numpy as np
 import random
 from datetime import datetime, timedelta
 from sklearn.cluster import KMeans
+from crime_schema import apply_schema
 
 os.environ["OMP_NUM_THREADS"] = "1"
 
@@ -41,7 +42,7 @@ def generate_crime_data():
             "Suspect_Clothing": random.choice(clothing_colors),
             "Outcome": random.choice(["Unsolved", "Solved"])
         })
-    return pd.DataFrame(data)
+    return apply_schema(pd.DataFrame(data))
 
 df = generate_crime_data()
 st.dataframe(df, use_container_width=True)
@@ -4,7 +4,10 @@ import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, timedelta
-from sklearn.cluster import KMeans
+from hotspots import fit_hotspots, choose_n_clusters, zone_name
+from dataset_cache import stamp_version, display_table, dataset_version
+from crime_schema import apply_schema, SCHEMA_VERSION
+from shared_dataset import publish_once
 
 os.environ["OMP_NUM_THREADS"] = "1"
 
@@ -21,7 +24,6 @@ if "selected_difficulty" not in st.session_state or st.session_state.selected_di
     st.session_state.attempts = difficulty_levels[difficulty]
     st.session_state.new_game = True
 
-@st.cache_data  # Cache dataset to keep cases consistent
 def generate_crime_data():
     crime_types = ["Robbery", "Assault", "Burglary", "Fraud", "Arson"]
     locations = ["Downtown", "City Park", "Suburbs", "Industrial Area", "Mall"]
@@ -44,24 +46,30 @@ def generate_crime_data():
             "Outcome": random.choice(["Unsolved", "Solved"]),
             "Time_Minutes": crime_time_minutes
         })
-    return pd.DataFrame(data)
+    return stamp_version(apply_schema(pd.DataFrame(data)))
 
-df = generate_crime_data()
-st.dataframe(df.drop(columns=["Time_Minutes"], errors="ignore"), use_container_width=True)
+@st.cache_resource  # Cache dataset to keep cases consistent; one server process generates it, the others map the same copy
+def shared_crime_data():
+    return publish_once("ai-to-the-rescue", generate_crime_data, version=SCHEMA_VERSION)
+
+df = shared_crime_data().to_frame()
+st.dataframe(display_table(df, hidden_columns=["Time_Minutes"]), use_container_width=True)
 
 # Crime pattern detection
 location_map = {"Downtown": 0, "City Park": 1, "Suburbs": 2, "Industrial Area": 3, "Mall": 4}
 df["Location_Code"] = df["Location"].map(location_map)
 df["Suspect_Gender"] = df["Suspect_Gender"].map({"Male": 0, "Female": 1})
 
-kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
-df['Cluster'] = kmeans.fit_predict(df[["Location_Code"]])
-df['Cluster_Location'] = df['Cluster'].map({0: "High-Risk Zone A", 1: "High-Risk Zone B", 2: "High-Risk Zone C"})
+# As many hotspots as the data supports (at most one fewer than the number of locations)
+n_zones = choose_n_clusters(df[["Location_Code"]], version=dataset_version(df))
+df['Cluster'] = fit_hotspots(df[["Location_Code"]], n_clusters=n_zones).labels_
+df['Cluster_Location'] = df['Cluster'].map(zone_name)
 
 cluster_hints = {
     "High-Risk Zone A": "Locals whisper about strange figures lurking in the shadows at odd hours...",
     "High-Risk Zone B": "The bustling crowd here makes it easier for quick hands to strike unnoticed...",
-    "High-Risk Zone C": "Neighbors have reported missing items when they return home late..."
+    "High-Risk Zone C": "Neighbors have reported missing items when they return home late...",
+    "High-Risk Zone D": "Shopkeepers mention the same unfamiliar face hanging around near closing time..."
 }
 
 df['Cluster_Hint'] = df['Cluster_Location'].map(cluster_hints)
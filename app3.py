@@ -3,9 +3,13 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import random
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-from sklearn.cluster import KMeans
+from hotspots import fit_hotspots, choose_n_clusters, zone_name
+from dataset_cache import stamp_version, display_table, dataset_version
+from chart_cache import cached_chart
+from hotspot_map import hotspot_bins, hotspot_figure
+from crime_schema import apply_schema, SCHEMA_VERSION
+from shared_dataset import publish_once
 
 os.environ["OMP_NUM_THREADS"] = "1"
 
@@ -21,7 +25,6 @@ attempts_left = difficulty_levels[difficulty]
 if "attempts" not in st.session_state or st.session_state.get("new_game", False):
     st.session_state.attempts = attempts_left
 
-@st.cache_data  # Cache dataset to keep cases consistent
 def generate_crime_data():
     crime_types = ["Robbery", "Assault", "Burglary", "Fraud", "Arson"]
     locations = ["Downtown", "City Park", "Suburbs", "Industrial Area", "Mall"]
@@ -44,38 +47,49 @@ def generate_crime_data():
             "Outcome": random.choice(["Unsolved", "Solved"]),
             "Time_Minutes": crime_time_minutes
         })
-    return pd.DataFrame(data)
+    return stamp_version(apply_schema(pd.DataFrame(data)))
 
-df = generate_crime_data()
-st.dataframe(df.drop(columns=["Time_Minutes"], errors="ignore"), use_container_width=True)
+@st.cache_resource  # Cache dataset to keep cases consistent; one server process generates it, the others map the same copy
+def shared_crime_data():
+    return publish_once("crime-distribution", generate_crime_data, version=SCHEMA_VERSION)
+
+df = shared_crime_data().to_frame()
+st.dataframe(display_table(df, hidden_columns=["Time_Minutes"]), use_container_width=True)
 
 # Crime pattern detection
 location_map = {"Downtown": 0, "City Park": 1, "Suburbs": 2, "Industrial Area": 3, "Mall": 4}
 df["Location_Code"] = df["Location"].map(location_map)
 df["Suspect_Gender"] = df["Suspect_Gender"].map({"Male": 0, "Female": 1})
 
-kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
-df['Cluster'] = kmeans.fit_predict(df[["Location_Code"]])
-df['Cluster_Location'] = df['Cluster'].map({0: "High-Risk Zone A", 1: "High-Risk Zone B", 2: "High-Risk Zone C"})
+# As many hotspots as the data supports (at most one fewer than the number of locations)
+n_zones = choose_n_clusters(df[["Location_Code"]], version=dataset_version(df))
+df['Cluster'] = fit_hotspots(df[["Location_Code"]], n_clusters=n_zones).labels_
+df['Cluster_Location'] = df['Cluster'].map(zone_name)
 
 cluster_hints = {
     "High-Risk Zone A": "Data shows 70% of crimes here happen at night, often involving weapons.",
     "High-Risk Zone B": "Statistically, fraud and pickpocketing occur 60% of the time in this zone.",
-    "High-Risk Zone C": "Burglary incidents make up 55% of crimes in this area, usually in the evenings."
+    "High-Risk Zone C": "Burglary incidents make up 55% of crimes in this area, usually in the evenings.",
+    "High-Risk Zone D": "Assaults here cluster around the afternoon, when the area is at its busiest."
 }
 
 df['Cluster_Hint'] = df['Cluster_Location'].map(cluster_hints)
 st.write("📊 AI-Detected Crime Hotspots:")
 st.dataframe(df[['Case_ID', 'Location', 'Time', 'Cluster_Location', 'Cluster_Hint']], use_container_width=True)
 
+# Hotspot map: only the per-cell case counts are sent to the browser
+st.write("🗺️ Crime Hotspot Map")
+st.plotly_chart(hotspot_figure(hotspot_bins(df, zones=list(cluster_hints))), use_container_width=True)
+
 # Visualizing Crime Distribution
 st.write("🔍 Crime Distribution Analysis")
-fig, ax = plt.subplots()
-df["Crime_Type"].value_counts().plot(kind='bar', color='skyblue', ax=ax)
-ax.set_xlabel("Crime Type")
-ax.set_ylabel("Frequency")
-ax.set_title("Crime Type Distribution")
-st.pyplot(fig)
+def draw_crime_distribution(fig, ax):
+    df["Crime_Type"].value_counts().plot(kind='bar', color='skyblue', ax=ax)
+    ax.set_xlabel("Crime Type")
+    ax.set_ylabel("Frequency")
+    ax.set_title("Crime Type Distribution")
+
+st.image(cached_chart("crime_type_distribution", dataset_version(df), draw_crime_distribution))
 
 # Select a case for the player
 if "selected_case" not in st.session_state or st.session_state.get("new_game", False):
@@ -0,0 +1,67 @@
+import json
+import os
+import random
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detective_catalog.json")
+SUPPORTED_VERSIONS = {1}
+
+SuspectProfile = namedtuple("SuspectProfile", ["id", "name", "background", "alibi"])
+EvidenceItem = namedtuple("EvidenceItem", ["id", "title", "detail"])
+Question = namedtuple("Question", ["id", "text"])
+Response = namedtuple("Response", ["answer", "cue"])
+Catalog = namedtuple("Catalog", ["version", "suspects", "suspect_ids", "evidence", "questions", "question_ids", "responses"])
+
+def _text(value):
+    # Interned so repeated strings across cases share one object
+    return sys.intern(value)
+
+@lru_cache(maxsize=None)
+def load_catalog(path=CATALOG_PATH):
+    """Load the suspect, evidence and interrogation banks once per process.
+
+    suspects, evidence and questions are tuples indexed by id; suspect_ids and
+    question_ids map names and question text back to ids; responses is keyed
+    by (question_id, role).
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if raw.get("version") not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported catalog version {raw.get('version')!r} in {path}")
+
+    suspects = tuple(
+        SuspectProfile(s["id"], _text(s["name"]), _text(s["background"]), _text(s["alibi"]))
+        for s in sorted(raw["suspects"], key=lambda s: s["id"])
+    )
+    evidence = tuple(
+        EvidenceItem(e["id"], _text(e["title"]), _text(e["detail"]))
+        for e in sorted(raw["evidence"], key=lambda e: e["id"])
+    )
+    for table in (suspects, evidence):
+        if [row.id for row in table] != list(range(len(table))):
+            raise ValueError(f"Catalog ids in {path} must run 0..n-1 without gaps")
+
+    questions = []
+    responses = {}
+    for q in sorted(raw["questions"], key=lambda q: q["id"]):
+        questions.append(Question(q["id"], _text(q["text"])))
+        for role, reply in q["responses"].items():
+            responses[(q["id"], _text(role))] = Response(_text(reply["answer"]), _text(reply["cue"]))
+
+    return Catalog(
+        version=raw["version"],
+        suspects=suspects,
+        suspect_ids={s.name: s.id for s in suspects},
+        evidence=evidence,
+        questions=tuple(questions),
+        question_ids={q.text: q.id for q in questions},
+        responses=responses,
+    )
+
+def evidence_order(catalog, seed):
+    """Seeded permutation of evidence ids, so the board keeps one order for a whole case."""
+    order = list(range(len(catalog.evidence)))
+    random.Random(seed).shuffle(order)
+    return order
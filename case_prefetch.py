@@ -0,0 +1,43 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every session in the process. Kept apart from the compute pool, so
+# games prepared in the background never delay interactive clustering and hints
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="case-prefetch")
+
+
+class CasePrefetcher:
+    """Keeps the next few cases for one session being prepared in the background.
+
+    build_case is called with no arguments on a worker thread and must not touch
+    st.* APIs, since there is no script context there. pop() hands back the oldest
+    prepared case (waiting only if it is still being built) and queues a
+    replacement, so "New Case" normally returns without doing any work.
+    """
+
+    def __init__(self, build_case, depth=2):
+        self.build_case = build_case
+        self.depth = depth
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self.fill()
+
+    def fill(self):
+        with self._lock:
+            while len(self._pending) < self.depth:
+                self._pending.append(_executor.submit(self.build_case))
+
+    def pop(self):
+        with self._lock:
+            future = self._pending.popleft() if self._pending else None
+        case = future.result() if future is not None else self.build_case()
+        self.fill()
+        return case
+
+    def discard(self):
+        """Drop prepared cases, e.g. after a setting they depend on has changed."""
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,66 @@
+import bisect
+from functools import lru_cache
+
+MINUTES_PER_DAY = 1440
+
+def parse_clock(text):
+    """Parse "HH:MM AM/PM" (or 24-hour "HH:MM") into minutes since midnight."""
+    text = text.strip()
+    suffix = text[-2:].upper()
+    if suffix in ("AM", "PM"):
+        hours, minutes = text[:-2].strip().split(":")
+        hours = int(hours) % 12
+        if suffix == "PM":
+            hours += 12
+    else:
+        hours, minutes = text.split(":")
+        hours = int(hours)
+    return hours * 60 + int(minutes)
+
+@lru_cache(maxsize=MINUTES_PER_DAY)
+def format_clock(minutes):
+    """Format minutes since midnight the same way the games print times, e.g. "09:05 PM"."""
+    hours, minutes = divmod(minutes % MINUTES_PER_DAY, 60)
+    return f"{hours % 12 or 12:02d}:{minutes:02d} {'AM' if hours < 12 else 'PM'}"
+
+
+class Timeline:
+    """Chronologically ordered case events.
+
+    Each event is keyed by its day (0 for the night of the crime, 1 for the
+    morning after, ...) and its minutes since midnight, so sorting by key is
+    always chronological. Display strings are only built when the timeline is
+    rendered.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._events = []
+
+    def add(self, time, event, day=0):
+        """Insert an event at a clock time on the given day."""
+        minutes = parse_clock(time) if isinstance(time, str) else time
+        key = day * MINUTES_PER_DAY + minutes
+        # bisect_right keeps events at the same minute in insertion order
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._events.insert(position, event)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        """Yield (display time, event) pairs in chronological order."""
+        for key, event in zip(self._keys, self._events):
+            yield format_clock(key), event
+
+def build_case_timeline(crime_time):
+    """The case's story: the crime on its evening, then the early hours of the next day."""
+    timeline = Timeline()
+    timeline.add(crime_time, "Crime reported at the scene.")
+    timeline.add("11:30 PM", "A suspicious call was made in the vicinity.")
+    timeline.add("11:45 PM", "CCTV captures multiple figures near the area.")
+    timeline.add("12:15 AM", "Forensic team arrives at the scene; unusual traces are found.", day=1)
+    # An extra event as a red herring
+    timeline.add("12:30 AM", "A passerby reported seeing a different figure lurking nearby.", day=1)
+    return timeline
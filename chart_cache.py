@@ -0,0 +1,49 @@
+import io
+import threading
+from collections import OrderedDict
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+class ChartCache:
+    """Rendered matplotlib/seaborn charts, keyed by (chart spec, data version), with LRU eviction.
+
+    A chart is drawn only the first time its key is seen, on a standalone Figure
+    with its own Agg canvas, and saved to PNG or SVG bytes. pyplot is not used,
+    so there is no global figure registry or backend to share between the
+    sessions' threads. Later reruns and other sessions get the stored bytes back.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, spec, version, draw, format="png", dpi=100, figsize=(6.4, 4.8)):
+        """Bytes of the chart that draw(fig, ax) produces; spec must be hashable and describe the chart fully."""
+        key = (spec, version, format, dpi, figsize)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        draw(fig, ax)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=format, dpi=dpi, bbox_inches="tight")
+        image = buffer.getvalue()
+
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return image
+
+# Shared by every page and session in the process
+chart_cache = ChartCache()
+
+def cached_chart(spec, version, draw, **options):
+    return chart_cache.render(spec, version, draw, **options)
@@ -3,8 +3,19 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import random
+import uuid
 from datetime import datetime
-from sklearn.cluster import KMeans
+from hotspots import fit_hotspots, choose_n_clusters, zone_name
+from dataset_cache import stamp_version, display_table, dataset_version
+from crime_schema import apply_schema, SCHEMA_VERSION
+from shared_dataset import publish_once
+from compute_pool import compute
+from crime_associations import association_hints
+from game_sessions import GameState, get_session_store, valid_token
+from theme import apply_theme, show_how_to_play, player_name_input, player_name, STORYLINE
+from score_store import get_score_store
+from skill_ratings import get_skill_model
+from posterior_hints import PosteriorHintEngine, build_prior_counts, AGE_EXACT, AGE_CLOSE, AGE_OFF
 
 # Debug: Ensure Streamlit is properly imported
 try:
@@ -23,65 +34,11 @@ st.set_page_config(
 # Set environment variable for KMeans (to avoid warnings)
 os.environ["OMP_NUM_THREADS"] = "1"
 
-# Custom CSS for styling
-st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f5f0e6;
-        color: #4f2022;
-        font-family: 'Helvetica Neue', sans-serif;
-    }
-    .stSelectbox div[data-baseweb="select"] > div {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border-radius: 5px !important;
-    }
-    .stSlider div[data-testid="stThumbValue"] {
-        color: #4f2022 !important;
-    }
-    .stSlider div[data-baseweb="slider"] {
-        background-color: transparent;
-    }
-    .stRadio div[role="radiogroup"] {
-        background-color: #ffffff !important;
-        padding: 10px;
-        border-radius: 5px;
-        border: 1px solid #9a816b;
-    }
-    .stButton>button {
-        background-color: #65b1df !important;
-        color: #ffffff !important;
-        border-radius: 8px;
-        padding: 10px 24px;
-        border: 2px solid #4f2022;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #4f2022 !important;
-        transform: scale(1.05);
-    }
-    .stSuccess {
-        background-color: #acdb01 !important;
-        color: #4f2022 !important;
-        border: 1px solid #9a816b;
-    }
-    .stError {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border: 1px solid #4f2022;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+# Nature-inspired theme (static stylesheet, see theme.py)
+apply_theme()
 
 # Sidebar for game instructions and status
-st.sidebar.header("How to Play")
-st.sidebar.write("""
-1. Select a difficulty level.
-2. Analyze the crime data and use the hints provided.
-3. Guess the suspect's location, age, and gender.
-4. Submit your findings and see if you're correct!
-5. You have a limited number of attempts. Use them wisely!
-""")
+show_how_to_play()
 
 # Initialize session state
 if "score" not in st.session_state:
@@ -99,12 +56,7 @@ if "show_correct_answer" not in st.session_state:
 
 # Game title and storyline
 st.title("🔍 Statistical Detective")
-st.write("""
-### 🕵️‍♂️ The Case of the Serial Suspect
-The city is in chaos! A series of crimes have been reported, and the police need your help to catch the suspects. 
-Use your statistical skills to analyze the data, interpret the clues, and identify the culprits. 
-Can you solve the case before time runs out?
-""")
+st.write(STORYLINE)
 
 # Difficulty settings
 difficulty_levels = {"Easy": 3, "Hard": 2, "Expert": 1}
@@ -114,6 +66,18 @@ attempts_left = difficulty_levels[difficulty]
 # Display score
 st.sidebar.write(f"🎯 Score: {st.session_state.score}")
 
+# Persistent leaderboard across sessions
+player_name_input()
+st.sidebar.subheader("🏆 Leaderboard")
+for rank, (player, total, plays) in enumerate(get_score_store().top_players("statistical-detective", 5), start=1):
+    st.sidebar.write(f"{rank}. {player}: {total:g} points ({plays} solved)")
+
+# Difficulty levels are rated like cases; suggest the one the player should solve about 70% of the time
+if player_name():
+    skill_model = get_skill_model("statistical-detective")
+    suggested = skill_model.recommend(player_name(), skill_model.candidates("difficulty", difficulty_levels), k=1)
+    st.sidebar.caption(f"🎚️ Suggested difficulty for you: {skill_model.items.names[suggested]}")
+
 # Define crime types, weapons, and crime scene evidence
 crime_weapons = {
     "Assault": {"Weapon": "Metal Rod", "Evidence": "The suspect was last seen holding a heavy metal rod before the attack."},
@@ -140,7 +104,6 @@ def get_time_period(time_minutes):
     return "Unknown"
 
 # Generate crime data
-@st.cache_data
 def generate_crime_data():
     crime_types = list(crime_weapons.keys())
     locations = ["Manjalpur", "Fatehgunj", "Gorwa", "Makarpura"]
@@ -164,14 +127,19 @@ def generate_crime_data():
             "Outcome": random.choice(["Unsolved", "Solved"]),
             "Time_Minutes": crime_time_minutes
         })
-    return pd.DataFrame(data)
+    return stamp_version(apply_schema(pd.DataFrame(data)))
+
+# Every replica plays on the same dataset, so a saved case means the same thing everywhere
+@st.cache_resource
+def shared_crime_data():
+    return publish_once("serial-suspect", generate_crime_data, version=SCHEMA_VERSION)
 
-df = generate_crime_data()
+df = shared_crime_data().to_frame()
 
 # Display crime database
 st.header("📊 Recent Crime Cases")
 st.dataframe(
-    df.drop(columns=["Time_Minutes", "Crime_Scene_Evidence", "Time_Period"], errors="ignore"),
+    display_table(df, hidden_columns=["Time_Minutes", "Crime_Scene_Evidence", "Time_Period"]),
     use_container_width=True,
     height=(len(df) + 1) * 35 + 3  # Dynamic height based on rows
 )
@@ -182,9 +150,9 @@ df["Location_Code"] = df["Location"].map(location_map)
 df["Suspect_Gender"] = df["Suspect_Gender"].map({"Male": 0, "Female": 1, "Other": 2})
 
 # Use multiple features for clustering
-kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
-df['Cluster'] = kmeans.fit_predict(df[["Location_Code", "Time_Minutes"]])
-df['Cluster_Location'] = df['Cluster'].map({0: "High-Risk Zone A", 1: "High-Risk Zone B", 2: "High-Risk Zone C"})
+n_zones = choose_n_clusters(df[["Location_Code", "Time_Minutes"]], version=dataset_version(df))
+df['Cluster'] = fit_hotspots(df[["Location_Code", "Time_Minutes"]], n_clusters=n_zones).labels_
+df['Cluster_Location'] = df['Cluster'].map(zone_name)
 
 # Generate dynamic cluster hints
 def generate_cluster_hints(df):
@@ -195,27 +163,72 @@ def generate_cluster_hints(df):
         weapon_crimes = cluster_data[cluster_data['Weapon_Used'] != "None"]
         burglary_crimes = cluster_data[cluster_data['Crime_Type'] == "Burglary"]
         
-        if cluster == 0:
+        # The number of zones depends on the data, so the three hint templates take turns
+        if cluster % 3 == 0:
             hint = f"Crimes in this area often occur at night ({len(night_crimes) / len(cluster_data) * 100:.0f}% of cases)."
-        elif cluster == 1:
+        elif cluster % 3 == 1:
             hint = f"This area has a high frequency of burglaries ({len(burglary_crimes) / len(cluster_data) * 100:.0f}% of cases)."
-        elif cluster == 2:
+        else:
             hint = f"Weapons are commonly used in crimes here ({len(weapon_crimes) / len(cluster_data) * 100:.0f}% of cases)."
         
-        cluster_hints[f"High-Risk Zone {chr(65 + cluster)}"] = hint
+        cluster_hints[zone_name(cluster)] = hint
     return cluster_hints
 
-cluster_hints = generate_cluster_hints(df)
+# Computed off the script thread, once per dataset
+cluster_hints = compute(
+    ("cluster_hints", dataset_version(df)), generate_cluster_hints,
+    df[["Cluster", "Time_Minutes", "Weapon_Used", "Crime_Type"]].copy(),
+)
 df['Cluster_Hint'] = df['Cluster_Location'].map(cluster_hints)
 
+def fresh_posterior():
+    # Posterior over suspect profiles, starting from the dataset's frequencies
+    return PosteriorHintEngine(build_prior_counts(
+        df["Location_Code"], df["Suspect_Age"], df["Suspect_Gender"],
+        n_locations=len(location_map), n_genders=3
+    ))
+
+# Game progress is saved under a token kept in the URL, so a reconnect to any replica resumes it
+def restore_game(saved):
+    st.session_state.score = saved.score
+    if saved.dataset_version == dataset_version(df) and 0 <= saved.case_index < len(df):
+        st.session_state.attempts = saved.attempts
+        st.session_state.hints_revealed = saved.hints_revealed
+        st.session_state.show_correct_answer = saved.show_correct_answer
+        st.session_state.selected_case = df.iloc[saved.case_index]
+        st.session_state.new_game = False
+        st.session_state.posterior = fresh_posterior()
+
+def persist_game():
+    case = st.session_state.selected_case
+    get_session_store().save(st.session_state.game_token, GameState(
+        attempts=st.session_state.attempts,
+        hints_revealed=st.session_state.hints_revealed,
+        score=st.session_state.score,
+        show_correct_answer=st.session_state.show_correct_answer,
+        # A finished case is not resumed; the next load picks a new one
+        case_index=-1 if case is None or st.session_state.new_game else int(case.name),
+        dataset_version=dataset_version(df),
+    ))
+
+if "game_token" not in st.session_state:
+    token = st.query_params.get("game")
+    st.session_state.game_token = token if valid_token(token) else uuid.uuid4().hex
+    st.query_params["game"] = st.session_state.game_token
+    saved = get_session_store().load(st.session_state.game_token)
+    if saved is not None:
+        restore_game(saved)
+
 # Select a case for the player
 if st.session_state.selected_case is None or st.session_state.new_game:
     st.session_state.selected_case = df.sample(1).iloc[0]
     st.session_state.new_game = False
     st.session_state.hints_revealed = 0  # Reset hints for new case
     st.session_state.show_correct_answer = False  # Reset correct answer display
+    st.session_state.posterior = fresh_posterior()
 
 selected_case = st.session_state.selected_case
+gender_labels = ["Male", "Female", "Other"]
 
 # Investigation toolkit
 st.divider()
@@ -225,67 +238,117 @@ st.header("🕵️ Investigation Toolkit")
 st.write(f"🔖 Age Range: The suspect is likely between {selected_case['Suspect_Age'] - 5} and {selected_case['Suspect_Age'] + 5} years old.")
 st.write(f"🔖 Location Analysis: A crime happened in this area that occurred during the {selected_case['Time_Period']}.")
 
-# Gradual hints based on attempts
-if st.session_state.hints_revealed >= 1:
-    st.write(f"🔖 Crime Type: The crime type is {selected_case['Crime_Type']}.")
-if st.session_state.hints_revealed >= 2:
-    st.write(f"🔖 Crime Scene Evidence: {selected_case['Crime_Scene_Evidence']}")
-
-# Investigation inputs
-col1, col2, col3 = st.columns(3)
-with col1:
-    guessed_location = st.selectbox("Crime Location", list(location_map.keys()), key="crime_location")
-with col2:
-    guessed_age = st.slider("Suspect Age", 18, 50, 30, key="suspect_age")
-with col3:
-    guessed_gender = st.radio("Suspect Gender", ["Male", "Female", "Other"], key="suspect_gender")
-
-guessed_gender = 0 if guessed_gender == "Male" else 1 if guessed_gender == "Female" else 2
-
-# Submit investigation
-if st.button("Submit Findings", type="primary"):
-    st.session_state.attempts -= 1
-    correct_location = guessed_location == selected_case["Location"]
-    correct_age = guessed_age == selected_case["Suspect_Age"]
-    correct_gender = guessed_gender == selected_case["Suspect_Gender"]
-    
-    if correct_location and correct_age and correct_gender:
-        st.success("🎉 Case Solved! You've identified the suspect! You win a sweet treat :)")
-        st.balloons()
-        st.session_state.score += 1  # Increase score
-        st.session_state.new_game = True  # Reset the game after solving the case
-    else:
-        feedback = []
-        if not correct_location:
-            feedback.append("📍 Location doesn't match.")
-        if abs(guessed_age - selected_case['Suspect_Age']) > 5:
-            feedback.append("📈 Age estimate significantly off.")
-        elif guessed_age != selected_case['Suspect_Age']:
-            feedback.append("📈 Age estimate close but not exact.")
-        if guessed_gender != selected_case['Suspect_Gender']:
-            feedback.append("👤 Gender mismatch.")
+# Significance tests between case attributes, computed once per dataset
+for hint in association_hints(df, version=dataset_version(df)):
+    st.write(f"📐 Statistical Test: {hint}")
+
+# The guess inputs and the submit/feedback flow run as fragments: moving a widget
+# reruns only the guess panel and submitting reruns only the feedback panel, so
+# the dataset, clustering and crime table above are not re-executed.
+def rerun_app_if_case_ended():
+    # Case selection and the score live outside the fragments, so a finished case needs a full rerun
+    if st.session_state.new_game:
+        st.rerun()
+
+@st.fragment
+def guess_panel():
+    rerun_app_if_case_ended()
+    # Investigation inputs; the feedback panel reads them back through their keys
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.selectbox("Crime Location", list(location_map.keys()), key="crime_location")
+    with col2:
+        st.slider("Suspect Age", 18, 50, 30, key="suspect_age")
+    with col3:
+        st.radio("Suspect Gender", ["Male", "Female", "Other"], key="suspect_gender")
+
+@st.fragment
+def feedback_panel(selected_case, difficulty):
+    rerun_app_if_case_ended()
+
+    # Submit investigation
+    if st.button("Submit Findings", type="primary"):
+        guessed_location = st.session_state.crime_location
+        guessed_age = st.session_state.suspect_age
+        guessed_gender = st.session_state.suspect_gender
+        guessed_gender = 0 if guessed_gender == "Male" else 1 if guessed_gender == "Female" else 2
+
+        st.session_state.attempts -= 1
+        correct_location = guessed_location == selected_case["Location"]
+        correct_age = guessed_age == selected_case["Suspect_Age"]
+        correct_gender = guessed_gender == selected_case["Suspect_Gender"]
         
-        if st.session_state.attempts > 0:
-            st.error(f"🚨 Investigation Issues: {' • '.join(feedback)}")
-            st.session_state.hints_revealed += 1  # Reveal more hints
+        if correct_location and correct_age and correct_gender:
+            st.success("🎉 Case Solved! You've identified the suspect! You win a sweet treat :)")
+            st.balloons()
+            st.session_state.score += 1  # Increase score
+            if player_name():
+                get_score_store().record(player_name(), "statistical-detective", 1)
+                get_skill_model("statistical-detective").update(player_name(), difficulty, True)
+            st.session_state.new_game = True  # Reset the game after solving the case
         else:
-            st.session_state.show_correct_answer = True  # Show correct answer
-
-# Display correct answer if attempts are exhausted
-if st.session_state.show_correct_answer:
-    st.error("❌ Case Closed. No attempts left! The correct answer was:")
-    st.write(f"📍 Location: {selected_case['Location']}")
-    st.write(f"🔢 Age: {selected_case['Suspect_Age']}")
-    st.write(f"👤 Gender: {'Male' if selected_case['Suspect_Gender'] == 0 else 'Female' if selected_case['Suspect_Gender'] == 1 else 'Other'}")
-    st.session_state.new_game = True  # Reset the game after revealing the correct answer
-    st.session_state.attempts = difficulty_levels[difficulty]  # Reset attempts for the next game
-    st.session_state.show_correct_answer = False  # Reset correct answer display
+            feedback = []
+            if not correct_location:
+                feedback.append("📍 Location doesn't match.")
+            if abs(guessed_age - selected_case['Suspect_Age']) > 5:
+                feedback.append("📈 Age estimate significantly off.")
+            elif guessed_age != selected_case['Suspect_Age']:
+                feedback.append("📈 Age estimate close but not exact.")
+            if guessed_gender != selected_case['Suspect_Gender']:
+                feedback.append("👤 Gender mismatch.")
+
+            # Narrow the suspect profile probabilities using the same feedback
+            if correct_age:
+                age_status = AGE_EXACT
+            elif abs(guessed_age - selected_case['Suspect_Age']) > 5:
+                age_status = AGE_OFF
+            else:
+                age_status = AGE_CLOSE
+            st.session_state.posterior.observe(
+                location_map[guessed_location], guessed_age, guessed_gender,
+                correct_location, age_status, correct_gender
+            )
+            
+            if st.session_state.attempts > 0:
+                st.error(f"🚨 Investigation Issues: {' • '.join(feedback)}")
+                st.session_state.hints_revealed += 1  # Reveal more hints
+            else:
+                st.session_state.show_correct_answer = True  # Show correct answer
+                if player_name():
+                    get_skill_model("statistical-detective").update(player_name(), difficulty, False)
+
+    # Gradual hints based on attempts
+    if st.session_state.hints_revealed >= 1:
+        st.write(f"🔖 Crime Type: The crime type is {selected_case['Crime_Type']}.")
+    if st.session_state.hints_revealed >= 2:
+        st.write(f"🔖 Crime Scene Evidence: {selected_case['Crime_Scene_Evidence']}")
+    if st.session_state.hints_revealed >= 1:
+        location_names = list(location_map.keys())
+        top_profiles = st.session_state.posterior.top_k(3)
+        st.write("🔖 Most likely suspect profiles given your findings so far:")
+        for location_code, age, gender_code, probability in top_profiles:
+            st.write(f"• {location_names[location_code]}, age {age}, {gender_labels[gender_code]} ({probability * 100:.1f}%)")
+
+    # Display correct answer if attempts are exhausted
+    if st.session_state.show_correct_answer:
+        st.error("❌ Case Closed. No attempts left! The correct answer was:")
+        st.write(f"📍 Location: {selected_case['Location']}")
+        st.write(f"🔢 Age: {selected_case['Suspect_Age']}")
+        st.write(f"👤 Gender: {'Male' if selected_case['Suspect_Gender'] == 0 else 'Female' if selected_case['Suspect_Gender'] == 1 else 'Other'}")
+        st.session_state.new_game = True  # Reset the game after revealing the correct answer
+        st.session_state.attempts = difficulty_levels[difficulty]  # Reset attempts for the next game
+        st.session_state.show_correct_answer = False  # Reset correct answer display
+
+    # Status bar
+    st.caption(f"🔑 Difficulty: {difficulty} • 🔍 Attempts Left: {st.session_state.attempts}")
+    persist_game()
 
-# Status bar
-st.caption(f"🔑 Difficulty: {difficulty} • 🔍 Attempts Left: {st.session_state.attempts}")
+guess_panel()
+feedback_panel(selected_case, difficulty)
 
 # New case button
 if st.button("🔄 Start New Case"):
     st.session_state.new_game = True
     st.session_state.hints_revealed = 0  # Reset hints for new case
     st.session_state.show_correct_answer = False  # Reset correct answer display
+    st.rerun()
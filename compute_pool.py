@@ -0,0 +1,96 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Bounded pool shared by every session for interactive work (clustering and statistics);
+# background case preparation has its own pool (case_prefetch.py) so it never queues ahead
+executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="compute")
+
+
+class ComputePool:
+    """Runs expensive pure functions off the script thread, memoized by their inputs.
+
+    Requests with the same key share one future, so a burst of reruns with the
+    same inputs computes once. While the script thread waits it keeps checking
+    session state, which is where Streamlit stops a run that a newer rerun of
+    the same session has superseded; the abandoned request is then
+    released, and work nobody else is waiting for is cancelled if it has not
+    started yet.
+    """
+
+    def __init__(self, executor=executor, max_entries=256, poll_interval=0.05):
+        self.executor = executor
+        self.max_entries = max_entries
+        self.poll_interval = poll_interval
+        self._futures = OrderedDict()
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, key, future):
+        self._futures[key] = future
+        self._futures.move_to_end(key)
+        while len(self._futures) > self.max_entries:
+            self._futures.popitem(last=False)
+
+    def _acquire(self, key, fn, args):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or future.cancelled() or (future.done() and future.exception() is not None):
+                future = self.executor.submit(fn, *args)
+                self._remember(key, future)
+            else:
+                self._futures.move_to_end(key)
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+        return future
+
+    def _release(self, key, future):
+        with self._lock:
+            self._waiters[key] -= 1
+            if self._waiters[key]:
+                return
+            del self._waiters[key]
+            # Nobody wants it any more: drop it if it has not started
+            if future.cancel() and self._futures.get(key) is future:
+                del self._futures[key]
+
+    def run(self, key, fn, *args):
+        """fn(*args), computed at most once per key while it stays cached."""
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return self._run_inline(key, fn, args)
+        future = self._acquire(key, fn, args)
+        try:
+            while not future.done():
+                try:
+                    future.result(timeout=self.poll_interval)
+                except TimeoutError:
+                    # Every session-state access is an interrupt point, and unlike touching
+                    # an element it sends nothing to the browser
+                    "_compute_pool_waiting" in st.session_state
+            return future.result()
+        finally:
+            self._release(key, future)
+
+    def _run_inline(self, key, fn, args):
+        # Already on a worker thread (e.g. case prefetching): waiting on the pool
+        # from inside it could deadlock, so compute here and share the result
+        with self._lock:
+            future = self._futures.get(key)
+        if future is not None and (future.running() or (future.done() and not future.cancelled())):
+            return future.result()
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        with self._lock:
+            self._remember(key, future)
+        return future.result()
+
+compute_pool = ComputePool()
+
+def compute(key, fn, *args):
+    return compute_pool.run(key, fn, *args)
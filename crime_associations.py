@@ -0,0 +1,134 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy import stats
+from compute_pool import compute
+from crime_cube import TIME_PERIODS, time_period_codes
+from hotspots import features_key
+
+# Attribute pairs tested for association, as (row attribute, column attribute)
+ASSOCIATION_PAIRS = [
+    ("Location", "Crime_Type"),
+    ("Time_Period", "Crime_Type"),
+    ("Weapon_Used", "Location"),
+]
+
+# Runs batches of permutations side by side; separate from the compute pool, which
+# may itself be running the tests
+_permutation_executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="permutation")
+
+AssociationTest = namedtuple("AssociationTest", ["rows", "columns", "statistic", "dof", "p_value", "method", "cases", "strongest"])
+
+def attribute_codes(df, name):
+    """Integer codes and labels of one attribute, over the labels that occur in the data.
+
+    Time_Period is derived from Time_Minutes when the dataset has no such column.
+    """
+    if name == "Time_Period" and name not in df:
+        codes = time_period_codes(df["Time_Minutes"])
+        present = np.flatnonzero(np.bincount(codes, minlength=len(TIME_PERIODS)))
+        remap = np.full(len(TIME_PERIODS), -1, dtype=np.int64)
+        remap[present] = np.arange(len(present))
+        return remap[codes], [TIME_PERIODS[i] for i in present]
+    categorical = pd.Categorical(df[name]).remove_unused_categories()
+    return categorical.codes.astype(np.int64), [str(c) for c in categorical.categories]
+
+def contingency_table(row_codes, column_codes, n_rows, n_columns):
+    """(n_rows, n_columns) array of case counts, built with one np.bincount."""
+    flat = np.asarray(row_codes, dtype=np.int64) * n_columns + column_codes
+    return np.bincount(flat, minlength=n_rows * n_columns).reshape(n_rows, n_columns)
+
+def expected_counts(table):
+    """Counts expected under independence, from the table's row and column totals."""
+    return np.outer(table.sum(axis=1), table.sum(axis=0)) / table.sum()
+
+def chi_square_statistic(tables, expected):
+    """Pearson's statistic for one table or a stack of tables sharing the same totals."""
+    return ((tables - expected) ** 2 / expected).sum(axis=(-2, -1))
+
+def _permutation_batch(row_codes, column_codes, n_rows, n_columns, expected, observed, size, seed):
+    rng = np.random.default_rng(seed)
+    # Shuffling one attribute against the other keeps both sets of totals, so every
+    # permuted table has the same expected counts
+    shuffled = rng.permuted(np.broadcast_to(column_codes, (size, len(column_codes))), axis=1)
+    cells = n_rows * n_columns
+    flat = (np.arange(size)[:, None] * cells + row_codes * n_columns + shuffled).ravel()
+    tables = np.bincount(flat, minlength=size * cells).reshape(size, n_rows, n_columns)
+    # A small tolerance, so ties with the observed table count as at least as extreme
+    return int((chi_square_statistic(tables, expected) >= observed - 1e-9).sum())
+
+def permutation_p_value(row_codes, column_codes, n_rows, n_columns, n_permutations=9999, batch_size=1000, seed=0):
+    """Monte Carlo permutation p-value of the chi-square statistic.
+
+    Permutations are drawn and tabulated in batches of batch_size (one bincount
+    per batch), and the batches run in parallel, each from its own seed.
+    """
+    table = contingency_table(row_codes, column_codes, n_rows, n_columns)
+    expected = expected_counts(table)
+    observed = chi_square_statistic(table, expected)
+    sizes = [min(batch_size, n_permutations - start) for start in range(0, n_permutations, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    extreme = sum(_permutation_executor.map(
+        lambda job: _permutation_batch(row_codes, column_codes, n_rows, n_columns, expected, observed, *job),
+        zip(sizes, seeds),
+    ))
+    return (extreme + 1) / (n_permutations + 1)
+
+def association_test(df, rows, columns, min_expected=5, n_permutations=9999, seed=0):
+    """Chi-square test of independence between two attributes of the cases.
+
+    When any expected count is below min_expected the chi-square approximation
+    is unreliable, so the p-value comes from a permutation test instead.
+    Returns None when either attribute takes a single value.
+    """
+    row_codes, row_labels = attribute_codes(df, rows)
+    column_codes, column_labels = attribute_codes(df, columns)
+    valid = (row_codes >= 0) & (column_codes >= 0)
+    row_codes, column_codes = row_codes[valid], column_codes[valid]
+    if len(row_labels) < 2 or len(column_labels) < 2:
+        return None
+    table = contingency_table(row_codes, column_codes, len(row_labels), len(column_labels))
+    expected = expected_counts(table)
+    statistic = float(chi_square_statistic(table, expected))
+    dof = (len(row_labels) - 1) * (len(column_labels) - 1)
+    if expected.min() < min_expected:
+        p_value = permutation_p_value(row_codes, column_codes, len(row_labels), len(column_labels), n_permutations, seed=seed)
+        method = "permutation"
+    else:
+        p_value = float(stats.chi2.sf(statistic, dof))
+        method = "chi-square"
+    # The cell furthest above its expected count (largest Pearson residual)
+    residuals = (table - expected) / np.sqrt(expected)
+    row, column = np.unravel_index(np.argmax(residuals), residuals.shape)
+    strongest = (row_labels[row], column_labels[column], int(table[row, column]), float(expected[row, column]))
+    return AssociationTest(rows, columns, statistic, dof, p_value, method, int(valid.sum()), strongest)
+
+def _describe(test, alpha):
+    row_label, column_label, count, expected = test.strongest
+    method = "permutation test" if test.method == "permutation" else "chi-square test"
+    evidence = f"χ² = {test.statistic:.1f}, p = {test.p_value:.3f} ({method}, {test.cases} cases)"
+    if test.p_value < alpha:
+        return (f"{test.rows} and {test.columns} are linked: {evidence}. "
+                f"{row_label} / {column_label} shows up {count} times against {expected:.1f} expected.")
+    return f"No clear link between {test.rows} and {test.columns}: {evidence}."
+
+def _association_hints(df, pairs, alpha):
+    hints = []
+    for rows, columns in pairs:
+        test = association_test(df, rows, columns)
+        if test is not None:
+            hints.append(_describe(test, alpha))
+    return hints
+
+def association_hints(df, version=None, pairs=ASSOCIATION_PAIRS, alpha=0.05):
+    """One hint with a real p-value per attribute pair, e.g. "Location and Crime_Type are linked: ...".
+
+    The tests are computed once per dataset version, or per table content when
+    no version is given.
+    """
+    needed = {name for pair in pairs for name in pair} | {"Time_Minutes"}
+    columns = [name for name in df.columns if name in needed]
+    key = ("associations", version or features_key(df[columns]), tuple(pairs), alpha)
+    return compute(key, _association_hints, df[columns].copy(), list(pairs), alpha)
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# Time periods in the order produced by minutes // 360 (6-hour blocks from midnight)
+TIME_PERIODS = ["Night", "Morning", "Afternoon", "Evening"]
+
+# Age bands are decades, matching the "likely in their 20s" style hints
+AGE_BANDS = [10, 20, 30, 40, 50, 60]
+
+def time_period_codes(time_minutes):
+    """Map minutes since midnight to TIME_PERIODS codes without a per-row loop."""
+    return np.asarray(time_minutes, dtype=np.int64) // 360
+
+def age_band_codes(ages):
+    """Map ages to AGE_BANDS codes."""
+    bands = np.asarray(ages, dtype=np.int64) // 10 * 10
+    return np.clip((bands - AGE_BANDS[0]) // 10, 0, len(AGE_BANDS) - 1)
+
+
+class FrequencyCube:
+    """Joint case counts over a fixed set of categorical dimensions.
+
+    Counts are built once with np.bincount on the flattened integer codes. Any
+    count, marginal or conditional is then an index into the cube plus a sum over
+    the free dimensions, so its cost depends on the number of categories only,
+    never on the number of cases.
+    """
+
+    def __init__(self, dimensions):
+        # dimensions: list of (column name, list of labels)
+        self.names = [name for name, _ in dimensions]
+        self.labels = {name: list(labels) for name, labels in dimensions}
+        self.lookup = {name: {label: i for i, label in enumerate(labels)} for name, labels in dimensions}
+        self.shape = tuple(len(labels) for _, labels in dimensions)
+        self.counts = np.zeros(self.shape, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, locations, crime_types, genders):
+        """Build the Location × Crime_Type × Time_Period × Gender × Age band cube for a dataset."""
+        cube = cls([
+            ("Location", locations),
+            ("Crime_Type", crime_types),
+            ("Time_Period", TIME_PERIODS),
+            ("Suspect_Gender", genders),
+            ("Age_Band", AGE_BANDS),
+        ])
+        cube.append(df)
+        return cube
+
+    def _codes(self, df):
+        codes = []
+        for name in self.names:
+            if name == "Time_Period" and "Time_Minutes" in df:
+                codes.append(time_period_codes(df["Time_Minutes"]))
+            elif name == "Age_Band":
+                codes.append(age_band_codes(df["Suspect_Age"]))
+            else:
+                codes.append(pd.Categorical(df[name], categories=self.labels[name]).codes.astype(np.int64))
+        return codes
+
+    def append(self, df):
+        """Add new cases to the counts; only the appended rows are scanned."""
+        codes = self._codes(df)
+        # Rows with a label outside the cube's categories get code -1 and are skipped
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        if not valid.any():
+            return
+        flat = np.ravel_multi_index([c[valid] for c in codes], self.shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.shape)
+
+    def _index(self, fixed):
+        index = [slice(None)] * len(self.names)
+        for name, label in fixed.items():
+            index[self.names.index(name)] = self.lookup[name][label]
+        return tuple(index)
+
+    def count(self, **fixed):
+        """Number of cases matching the given labels, e.g. count(Location="Gorwa", Time_Period="Night")."""
+        return int(self.counts[self._index(fixed)].sum())
+
+    def total(self):
+        return int(self.counts.sum())
+
+    def distribution(self, name, given=None):
+        """P(name | given) as a {label: probability} dict; empty slices give all zeros."""
+        given = given or {}
+        sliced = self.counts[self._index(given)]
+        # Dimensions fixed by `given` are gone from the slice, so find where `name` ended up
+        free = [n for n in self.names if n not in given]
+        axis = free.index(name)
+        totals = sliced.sum(axis=tuple(a for a in range(sliced.ndim) if a != axis))
+        denominator = totals.sum()
+        if denominator == 0:
+            return {label: 0.0 for label in self.labels[name]}
+        return {label: float(totals[i] / denominator) for i, label in enumerate(self.labels[name])}
+
+    def probability(self, name, label, given=None):
+        """P(name = label | given)."""
+        return self.distribution(name, given)[label]
@@ -0,0 +1,89 @@
+import hashlib
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+# Enumerated columns are stored as pandas Categorical: one small integer code per
+# row plus a single copy of each distinct label
+CATEGORICAL_COLUMNS = [
+    "Location", "Crime_Type", "Suspect_Gender", "Weapon_Used", "Outcome",
+    "Time_Period", "Suspect_Name", "Crime_Report", "Suspect_Clothing",
+]
+
+# Narrow integer types; the ranges cover every generator in the repo
+INTEGER_COLUMNS = {
+    "Suspect_Age": np.int8,      # 18-65
+    "Time_Minutes": np.int16,    # 0-1439
+    "Case_ID": np.int32,
+}
+
+# Free-text columns whose sentences repeat across rows and across datasets
+POOLED_TEXT_COLUMNS = ["Crime_Scene_Evidence"]
+
+# Changes with the column settings above; shared datasets (shared_dataset.py) are versioned by it
+SCHEMA_VERSION = hashlib.sha1(repr((
+    CATEGORICAL_COLUMNS,
+    sorted((name, np.dtype(dtype).str) for name, dtype in INTEGER_COLUMNS.items()),
+    POOLED_TEXT_COLUMNS,
+)).encode()).hexdigest()[:12]
+
+
+class StringPool:
+    """Process-wide table of distinct strings with stable integer codes.
+
+    Pooled columns are Categoricals over the pool's contents, so every dataset
+    shares one interned copy of each sentence and the same sentence always has
+    the same code.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._values = []
+        self._lock = threading.Lock()
+
+    def encode(self, values):
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = self._codes.get(value)
+            if code is None:
+                code = len(self._values)
+                value = sys.intern(value)
+                self._codes[value] = code
+                self._values.append(value)
+            codes[i] = code
+        return codes
+
+    def categorical(self, values):
+        """Pooled Categorical for a column; only its distinct values are looked up."""
+        uniques, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+        with self._lock:
+            codes = self.encode(uniques)[inverse]
+            categories = list(self._values)
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+EVIDENCE_POOL = StringPool()
+
+def apply_schema(df, categories=None):
+    """Convert a generated crime DataFrame to the shared compact dtypes in place and return it.
+
+    categories optionally fixes the category order for a column (e.g. the game's
+    location list) so codes line up with the game's own maps.
+    """
+    categories = categories or {}
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = pd.Categorical(df[column], categories=categories.get(column))
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df:
+            df[column] = df[column].astype(dtype)
+    for column in POOLED_TEXT_COLUMNS:
+        if column in df:
+            df[column] = EVIDENCE_POOL.categorical(df[column])
+    return df
+
+def bytes_per_row(df):
+    """Average memory per row, counting string contents (deep)."""
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(deep=True, index=False).sum() / len(df)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Day 0 for the integer day offsets; all generators draw dates from 2024 onwards
+EPOCH = np.datetime64("2024-01-01", "D")
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def day_offsets(dates, epoch=EPOCH):
+    """Convert a Date column ("YYYY-MM-DD" strings or datetimes) to int32 days since epoch."""
+    days = pd.to_datetime(np.asarray(dates)).values.astype("datetime64[D]")
+    return (days - epoch).astype(np.int32)
+
+def group_codes(df, columns):
+    """Joint integer code per row over several categorical columns, plus the label of each code."""
+    codes = np.zeros(len(df), dtype=np.int64)
+    labels = [()]
+    for column in columns:
+        categorical = pd.Categorical(df[column])
+        categories = list(categorical.categories)
+        codes = codes * len(categories) + categorical.codes
+        labels = [label + (category,) for label in labels for category in categories]
+    return codes, labels
+
+def daily_counts(days, groups, n_groups, n_days):
+    """(n_groups, n_days) array of case counts, built with one np.bincount."""
+    flat = np.asarray(groups, dtype=np.int64) * n_days + days
+    return np.bincount(flat, minlength=n_groups * n_days).reshape(n_groups, n_days)
+
+def rolling_sums(counts, window):
+    """Trailing window sums along the day axis: entry d covers days d-window+1 .. d."""
+    cumulative = np.cumsum(counts, axis=-1)
+    sums = cumulative.copy()
+    sums[..., window:] -= cumulative[..., :-window]
+    return sums
+
+def rolling_rates(counts, window):
+    """Average cases per day over a trailing window."""
+    return rolling_sums(counts, window) / window
+
+def weekday_profile(counts, epoch=EPOCH):
+    """Share of each group's cases falling on each weekday, shape (n_groups, 7), Monday first."""
+    n_days = counts.shape[-1]
+    # 1970-01-01 was a Thursday (weekday 3)
+    first_weekday = (int(epoch.astype(np.int64)) + 3) % 7
+    weekday = (np.arange(n_days) + first_weekday) % 7
+    totals = np.stack([counts[..., weekday == d].sum(axis=-1) for d in range(7)], axis=-1)
+    denominator = totals.sum(axis=-1, keepdims=True)
+    return np.divide(totals, denominator, out=np.zeros(totals.shape), where=denominator > 0)
+
+def anomaly_scores(counts, window=7, baseline=28):
+    """z-score of each trailing window's daily rate against the baseline days just before it.
+
+    Uses cumulative sums of counts and squared counts, so the cost is O(n_days)
+    per group whatever the window sizes. Days without a full baseline score 0.
+    """
+    counts = counts.astype(np.float64)
+    recent = rolling_sums(counts, window) / window
+    base_sum = rolling_sums(counts, baseline)
+    base_sq = rolling_sums(counts ** 2, baseline)
+    scores = np.zeros(counts.shape)
+    start = window + baseline - 1
+    if counts.shape[-1] <= start:
+        return scores
+    # The baseline for day d ends right before its window starts, at d - window
+    mean = base_sum[..., start - window:-window] / baseline
+    variance = np.maximum(base_sq[..., start - window:-window] / baseline - mean ** 2, 0.0)
+    stderr = np.sqrt(variance / window) + 1e-9
+    scores[..., start:] = (recent[..., start:] - mean) / stderr
+    return scores
+
+def trend_hints(df, window=30, min_count=2, limit=3):
+    """Hints for (location, crime type) pairs whose case count over the last window at least doubled.
+
+    The window ends at the latest date in the data; each hint compares it with the
+    window before, e.g. "Burglary cases in Gorwa doubled in the last 30 days (2 → 4)".
+    """
+    if len(df) == 0:
+        return []
+    days = day_offsets(df["Date"])
+    days = days - days.min()
+    groups, labels = group_codes(df, ["Location", "Crime_Type"])
+    n_days = int(days.max()) + 1
+    sums = rolling_sums(daily_counts(days, groups, len(labels), n_days), window)
+    recent = sums[:, -1]
+    previous = sums[:, -1 - window] if n_days > window else np.zeros_like(recent)
+
+    rising = np.flatnonzero((recent >= min_count) & (previous > 0) & (recent >= 2 * previous))
+    # Strongest increases first
+    rising = rising[np.argsort(-(recent[rising] / previous[rising]), kind="stable")][:limit]
+    hints = []
+    for group in rising:
+        location, crime_type = labels[group]
+        ratio = recent[group] / previous[group]
+        change = "doubled" if ratio < 3 else f"rose {ratio:.0f}x"
+        hints.append(f"{crime_type} cases in {location} {change} in the last {window} days ({previous[group]} → {recent[group]})")
+    return hints
@@ -0,0 +1,36 @@
+import uuid
+import pyarrow as pa
+import streamlit as st
+
+def stamp_version(df):
+    """Tag a freshly generated dataset with a unique version id and return it.
+
+    The id lives in df.attrs, which pandas keeps through copies and the pickling
+    done by st.cache_data, so every rerun's copy of a cached dataset reports the
+    same version without the frame being hashed.
+    """
+    df.attrs["dataset_version"] = uuid.uuid4().hex
+    return df
+
+def dataset_version(df):
+    return df.attrs["dataset_version"]
+
+def to_arrow(df):
+    """Immutable Arrow copy of a dataset, ready to hand to st.dataframe."""
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+@st.cache_resource(max_entries=64)  # Arrow tables are immutable, so one copy is shared by all sessions
+def _arrow_dataset(version, _df):
+    return to_arrow(_df)
+
+def visible_columns(table, hidden_columns=()):
+    """Zero-copy projection of an Arrow table without the hidden columns."""
+    return table.select([name for name in table.column_names if name not in hidden_columns])
+
+def display_table(df, hidden_columns=()):
+    """Arrow display projection of a versioned dataset, converted once per version.
+
+    Call it before adding working columns to df; the cached table reflects the
+    frame as it was on the first call for its version.
+    """
+    return visible_columns(_arrow_dataset(dataset_version(df), df), hidden_columns)
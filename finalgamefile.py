@@ -3,9 +3,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import random
+import uuid
 from datetime import datetime, timedelta
-from sklearn.cluster import KMeans
+from hotspots import fit_hotspots, choose_n_clusters, zone_name
+from dataset_cache import to_arrow, visible_columns
+from crime_schema import apply_schema
 from scipy import stats  # For confidence interval calculation
+from theme import apply_theme, show_how_to_play
+from crime_cube import FrequencyCube
+from case_prefetch import CasePrefetcher
+from crime_trends import trend_hints
+from crime_associations import association_hints
 
 # Set page configuration first
 st.set_page_config(layout="wide")  # Wide layout for better display
@@ -19,65 +27,11 @@ except NameError:
 
 os.environ["OMP_NUM_THREADS"] = "1"
 
-# Custom CSS for styling
-st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f5f0e6;
-        color: #4f2022;
-        font-family: 'Helvetica Neue', sans-serif;
-    }
-    .stSelectbox div[data-baseweb="select"] > div {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border-radius: 5px !important;
-    }
-    .stSlider div[data-testid="stThumbValue"] {
-        color: #4f2022 !important;
-    }
-    .stSlider div[data-baseweb="slider"] {
-        background-color: transparent;
-    }
-    .stRadio div[role="radiogroup"] {
-        background-color: #ffffff !important;
-        padding: 10px;
-        border-radius: 5px;
-        border: 1px solid #9a816b;
-    }
-    .stButton>button {
-        background-color: #65b1df !important;
-        color: #ffffff !important;
-        border-radius: 8px;
-        padding: 10px 24px;
-        border: 2px solid #4f2022;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #4f2022 !important;
-        transform: scale(1.05);
-    }
-    .stSuccess {
-        background-color: #acdb01 !important;
-        color: #4f2022 !important;
-        border: 1px solid #9a816b;
-    }
-    .stError {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border: 1px solid #4f2022;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+# Nature-inspired theme (static stylesheet, see theme.py)
+apply_theme()
 
 # Sidebar for game instructions and status
-st.sidebar.header("How to Play")
-st.sidebar.write("""
-1. Select a difficulty level.
-2. Analyze the crime data and use the hints provided.
-3. Guess the suspect's location, age, and gender.
-4. Submit your findings and see if you're correct!
-5. You have a limited number of attempts. Use them wisely!
-""")
+show_how_to_play()
 
 st.title("\U0001F50E Statistical Detective")
 st.write("Use statistics and hints! Analyze the data, interpret the probabilities, and catch the suspect!")
@@ -90,42 +44,32 @@ difficulty = st.selectbox("Select Difficulty Level", list(difficulty_levels.keys
 if "attempts" not in st.session_state or st.session_state.get("new_game", False):
     st.session_state.attempts = difficulty_levels[difficulty]
 
-@st.cache_data  # Cache dataset to keep cases consistent
-def generate_crime_data():
+def generate_crime_data(rng):
     crime_types = ["Robbery", "Assault", "Burglary", "Fraud", "Arson"]
     locations = ["Manjalpur", "Fatehgunj", "Gorwa", "Makarpura"]
     data = []
     start_date = datetime(2024, 1, 1)
     end_date = datetime(2025, 2, 1)
     for i in range(1, 11):  # Generate 20 cases
-        crime_date = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-        crime_time_minutes = random.randint(0, 1439)
+        crime_date = start_date + timedelta(days=rng.randint(0, (end_date - start_date).days))
+        crime_time_minutes = rng.randint(0, 1439)
         formatted_time = datetime.strptime(f"{crime_time_minutes // 60}:{crime_time_minutes % 60}", "%H:%M").strftime("%I:%M %p")
         data.append({
             "Case_ID": i,
             "Date": crime_date.strftime('%Y-%m-%d'),
             "Time": formatted_time,
-            "Location": random.choice(locations),
-            "Crime_Type": random.choice(crime_types),
-            "Suspect_Age": random.randint(18, 50),
-            "Suspect_Gender": random.choice(["Male", "Female"]),
-            "Weapon_Used": random.choice(["Knife", "Gun", "None"]),
-            "Outcome": random.choice(["Unsolved", "Solved"]),
+            "Location": rng.choice(locations),
+            "Crime_Type": rng.choice(crime_types),
+            "Suspect_Age": rng.randint(18, 50),
+            "Suspect_Gender": rng.choice(["Male", "Female"]),
+            "Weapon_Used": rng.choice(["Knife", "Gun", "None"]),
+            "Outcome": rng.choice(["Unsolved", "Solved"]),
             "Time_Minutes": crime_time_minutes
         })
-    return pd.DataFrame(data)
-
-df = generate_crime_data()
-st.dataframe(df.drop(columns=["Time_Minutes"], errors="ignore"), use_container_width=True)
+    return apply_schema(pd.DataFrame(data))
 
 # Crime pattern detection
 location_map = {"Manjalpur": 0, "Fatehgunj": 1, "Gorwa": 2, "Makarpura": 3}
-df["Location_Code"] = df["Location"].map(location_map)
-df["Suspect_Gender"] = df["Suspect_Gender"].map({"Male": 0, "Female": 1})
-
-kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
-df['Cluster'] = kmeans.fit_predict(df[["Location_Code"]])
-df['Cluster_Location'] = df['Cluster'].map({0: "High-Risk Zone A", 1: "High-Risk Zone B", 2: "High-Risk Zone C"})
 
 cluster_hints = {
     "High-Risk Zone A": "Data shows 70% of crimes here happen at night, often involving weapons.",
@@ -133,34 +77,83 @@ cluster_hints = {
     "High-Risk Zone C": "Burglary incidents make up 55% of crimes in this area, usually in the evenings."
 }
 
-df['Cluster_Hint'] = df['Cluster_Location'].map(cluster_hints)
-
-# Select a case for the player
-if "selected_case" not in st.session_state or st.session_state.get("new_game", False):
-    st.session_state.selected_case = df.sample(1).iloc[0]
-    st.session_state.new_game = False
-
-selected_case = st.session_state.selected_case
+def prepare_game(seed, stream):
+    """Build a complete game: dataset, hotspots, the case to solve and its hints.
+
+    stream names the player's sequence of games, so hotspot labels stay stable
+    from one of their games to the next.
+
+    Runs on a prefetch worker thread, so it must not call any st.* functions.
+    """
+    rng = random.Random(seed)
+    df = generate_crime_data(rng)
+    cube = FrequencyCube.from_frame(
+        df,
+        locations=list(location_map.keys()),
+        crime_types=["Robbery", "Assault", "Burglary", "Fraud", "Arson"],
+        genders=["Male", "Female"],
+    )
+    # Arrow copy taken before the working columns below are added; hiding columns is a zero-copy select
+    display_table = visible_columns(to_arrow(df), hidden_columns=["Time_Minutes"])
+    trends = trend_hints(df)
+    associations = association_hints(df)
+
+    df["Location_Code"] = df["Location"].map(location_map)
+    df["Suspect_Gender"] = df["Suspect_Gender"].map({"Male": 0, "Female": 1})
+
+    # Every game refits on a new dataset; the stream keeps each zone's label (and hint) from game to game
+    n_zones = choose_n_clusters(df[["Location_Code"]])
+    df['Cluster'] = fit_hotspots(df[["Location_Code"]], n_clusters=n_zones, stream=stream).labels_
+    df['Cluster_Location'] = df['Cluster'].map(zone_name)
+    df['Cluster_Hint'] = df['Cluster_Location'].map(cluster_hints)
+
+    # Select a case for the player
+    selected_case = df.sample(1, random_state=rng.getrandbits(32)).iloc[0]
+
+    # Calculate the confidence interval for suspect age
+    age_group = selected_case['Suspect_Age'] // 10 * 10
+    age_count = cube.count(Age_Band=age_group)
+    total_cases = cube.total()
+
+    # Proportion of suspects in the same age group
+    proportion = age_count / total_cases
+
+    # 95% confidence interval for proportion
+    ci_low, ci_high = stats.norm.interval(0.95, loc=proportion, scale=np.sqrt(proportion * (1 - proportion) / total_cases))
+
+    return {
+        "seed": seed,
+        "display_table": display_table,
+        "selected_case": selected_case,
+        "age_group": age_group,
+        # Convert confidence interval into percentage
+        "confidence_percent": (int(ci_low * 100), int(ci_high * 100)),
+        "trend_hints": trends,
+        "association_hints": associations,
+    }
 
-# Calculate the confidence interval for suspect age
-age_group = selected_case['Suspect_Age'] // 10 * 10
-age_data = df['Suspect_Age']
-age_count = age_data[(age_data // 10 * 10) == age_group].count()
-total_cases = len(age_data)
+# The next games are prepared in the background while this one is played
+if "prefetcher" not in st.session_state:
+    hotspot_stream = f"statistical-detective/{uuid.uuid4().hex}"  # this session's games only
+    st.session_state.prefetcher = CasePrefetcher(lambda: prepare_game(random.getrandbits(32), hotspot_stream))
 
-# Proportion of suspects in the same age group
-proportion = age_count / total_cases
+if "game" not in st.session_state or st.session_state.get("new_game", False):
+    st.session_state.game = st.session_state.prefetcher.pop()
+    st.session_state.new_game = False
 
-# 95% confidence interval for proportion
-ci_low, ci_high = stats.norm.interval(0.95, loc=proportion, scale=np.sqrt(proportion * (1 - proportion) / total_cases))
+game = st.session_state.game
+selected_case = game["selected_case"]
+age_group = game["age_group"]
 
-# Convert confidence interval into percentage
-confidence_percent_low = int(ci_low * 100)
-confidence_percent_high = int(ci_high * 100)
+st.dataframe(game["display_table"], use_container_width=True)
 
 st.write("\U0001F4CA Hints:")
 st.write(f"\U0001F575 Probability suggests the suspect is likely in their {age_group}s.")
 st.write(f"\U0001F4CD Location Analysis: {selected_case['Cluster_Hint']}")
+for hint in game["trend_hints"]:
+    st.write(f"📅 Trend: {hint}")
+for hint in game["association_hints"]:
+    st.write(f"📐 Statistical Test: {hint}")
 
 st.write(f"🔢 Attempts left: {st.session_state.attempts}")
 
@@ -209,5 +202,4 @@ if st.button("Submit Guess", key="submit_guess"):
 if st.button("🔄 New Game"):
     st.session_state.new_game = True
     st.session_state.attempts = difficulty_levels[difficulty]
-    st.cache_data.clear()  # Clear previous dataset to generate new random crime cases
-    st.rerun()
+    st.rerun()  # The next game, with a fresh dataset, is already prepared in the background
@@ -0,0 +1,212 @@
+import atexit
+import logging
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from score_store import DB_PATH
+
+# Progress of one detective game. case_index is the selected case's row in the
+# shared dataset identified by dataset_version (a uuid hex string), or -1.
+GameState = namedtuple("GameState", ["attempts", "hints_revealed", "score", "show_correct_answer", "case_index", "dataset_version"])
+
+# Session tokens are uuid4 hex strings; they come from the URL, so nothing else is accepted
+_TOKEN = re.compile(r"[0-9a-f]{32}")
+
+def valid_token(token):
+    return isinstance(token, str) and _TOKEN.fullmatch(token) is not None
+
+logger = logging.getLogger(__name__)
+
+CODEC_VERSION = 1
+# version, attempts, hints revealed, score, show answer, case index, dataset uuid: 28 bytes
+_LAYOUT = struct.Struct("<BbBI?i16s")
+
+def encode_state(state):
+    version = bytes.fromhex(state.dataset_version) if state.dataset_version else bytes(16)
+    return _LAYOUT.pack(CODEC_VERSION, state.attempts, state.hints_revealed, state.score,
+                        state.show_correct_answer, state.case_index, version)
+
+def decode_state(data):
+    codec, attempts, hints_revealed, score, show_correct_answer, case_index, version = _LAYOUT.unpack(data)
+    if codec != CODEC_VERSION:
+        raise ValueError(f"Unsupported game state codec version {codec}")
+    return GameState(attempts, hints_revealed, score, show_correct_answer, case_index,
+                     version.hex() if any(version) else None)
+
+
+class SQLiteBackend:
+    """Key-value stand-in on a WAL-mode SQLite table; any store with get/put_many can replace it."""
+
+    def __init__(self, path=DB_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS game_sessions (token TEXT PRIMARY KEY, state BLOB NOT NULL, updated REAL NOT NULL)")
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM game_sessions WHERE token = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock:
+            if self._conn.in_transaction:
+                # Left open by a rollback that itself failed
+                self._conn.execute("ROLLBACK")
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO game_sessions (token, state, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT (token) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                    [(key, value, now) for key, value in items],
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FileBackend:
+    """One small file per key in a shared directory (e.g. a network mount)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        # Keys become file names, so anything but a token could reach outside the directory
+        if not valid_token(key):
+            raise ValueError(f"Invalid session token {key!r}")
+        return os.path.join(self.directory, f"{key}.state")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_many(self, items):
+        for key, value in items:
+            temporary = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(value)
+            os.replace(temporary, self._path(key))
+
+    def close(self):
+        pass
+
+
+class SessionStore:
+    """Game states by session token, shared by every replica through a backend.
+
+    save() updates a small LRU read cache and queues the encoded state; queued
+    states are written in one batch by a background thread every
+    flush_interval seconds (or as soon as batch_size tokens are waiting), with
+    repeated saves of a token coalesced. A batch that fails to write is queued
+    again, except for tokens saved anew in the meantime.
+    Cached reads are trusted for cache_ttl seconds, after which another
+    replica may have moved the game on, so the backend is asked again.
+    """
+
+    def __init__(self, backend, flush_interval=0.25, batch_size=200, cache_size=1024, cache_ttl=5.0):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()   # token -> (encoded state, time cached)
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Held across taking and writing a batch, so an older batch never lands after a newer one
+        self._flush_lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="session-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _remember(self, token, data):
+        self._cache[token] = (data, time.monotonic())
+        self._cache.move_to_end(token)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def load(self, token):
+        with self._lock:
+            data = self._pending.get(token)
+            cached = self._cache.get(token)
+            if data is None and cached is not None and time.monotonic() - cached[1] < self.cache_ttl:
+                data = cached[0]
+        if data is None:
+            data = self.backend.get(token)
+            if data is None:
+                return None
+            with self._lock:
+                self._remember(token, data)
+        return decode_state(data)
+
+    def save(self, token, state):
+        data = encode_state(state)
+        with self._lock:
+            cached = self._cache.get(token)
+            if cached is not None and cached[0] == data:
+                return
+            self._remember(token, data)
+            self._pending[token] = data
+            full = len(self._pending) >= self.batch_size
+        if full:
+            # Written by the flusher, so a failing backend never raises into the game
+            self._wake.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                self.backend.put_many(pending.items())
+            except (OSError, sqlite3.Error):
+                with self._lock:
+                    for token, data in pending.items():
+                        self._pending.setdefault(token, data)
+                raise
+
+    def _flush_periodically(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except (OSError, sqlite3.Error) as error:
+                logger.warning("Saving game sessions failed, retrying: %s", error)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        self.backend.close()
+
+@lru_cache(maxsize=None)
+def get_session_store():
+    """The process-wide store; DETECTIVE_SESSION_BACKEND=file:<directory> selects the file backend."""
+    setting = os.environ.get("DETECTIVE_SESSION_BACKEND", "")
+    if setting.startswith("file:"):
+        return SessionStore(FileBackend(setting[len("file:"):]))
+    return SessionStore(SQLiteBackend(setting[len("sqlite:"):] if setting.startswith("sqlite:") else DB_PATH))
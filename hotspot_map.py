@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from dataset_cache import dataset_version
+
+# District centres on a plain city plane in km, for every location used by the games
+LOCATION_COORDINATES = {
+    "Downtown": (0.0, 0.0),
+    "City Park": (-2.0, 1.5),
+    "Suburbs": (3.0, 3.0),
+    "Industrial Area": (3.0, -2.5),
+    "Mall": (-2.5, -2.0),
+    "Fatehgunj": (0.0, 2.0),
+    "Gorwa": (-3.0, 1.0),
+    "Manjalpur": (0.0, -3.0),
+    "Makarpura": (1.0, -5.0),
+}
+DISTRICT_RADIUS = 1.0
+CELL_SIZE = 0.5
+
+def case_points(case_ids, location_codes, centres, radius=DISTRICT_RADIUS):
+    """Deterministic (x, y) for each case inside its location's district.
+
+    The cases carry no addresses, so each Case_ID is hashed to a fixed spot in
+    its district; the same case always lands in the same place.
+    """
+    ids = np.asarray(case_ids, dtype=np.uint64)
+    # Fibonacci hashing; the high and low halves give a uniform angle and radius
+    h = ids * np.uint64(0x9E3779B97F4A7C15)
+    u = (h >> np.uint64(32)).astype(np.float64) / 2**32
+    v = (h & np.uint64(0xFFFFFFFF)).astype(np.float64) / 2**32
+    angle = 2 * np.pi * u
+    distance = radius * np.sqrt(v)
+    centres = np.asarray(centres, dtype=np.float64)[location_codes]
+    return centres[:, 0] + distance * np.cos(angle), centres[:, 1] + distance * np.sin(angle)
+
+def grid_bins(x, y, location_codes, clusters, locations, zones, cell_size=CELL_SIZE):
+    """Case counts per (location, zone, grid cell), built with one np.bincount; empty cells are dropped."""
+    x0, y0 = x.min(), y.min()
+    gx = ((x - x0) // cell_size).astype(np.int64)
+    gy = ((y - y0) // cell_size).astype(np.int64)
+    nx, ny = int(gx.max()) + 1, int(gy.max()) + 1
+    shape = (len(locations), len(zones), ny, nx)
+    flat = np.ravel_multi_index((np.asarray(location_codes), np.asarray(clusters), gy, gx), shape)
+    counts = np.bincount(flat, minlength=int(np.prod(shape)))
+    occupied = np.flatnonzero(counts)
+    location, zone, cy, cx = np.unravel_index(occupied, shape)
+    return pd.DataFrame({
+        "x": x0 + (cx + 0.5) * cell_size,
+        "y": y0 + (cy + 0.5) * cell_size,
+        "Location": np.asarray(locations)[location],
+        "Cluster_Location": np.asarray(zones)[zone],
+        "Cases": counts[occupied],
+    })
+
+@st.cache_data(max_entries=64)  # Keyed by dataset version; the frame itself is never hashed
+def _hotspot_bins(version, _df, zones, cell_size):
+    locations = list(_df["Location"].cat.categories)
+    centres = [LOCATION_COORDINATES[location] for location in locations]
+    codes = _df["Location"].cat.codes.to_numpy()
+    x, y = case_points(_df["Case_ID"].to_numpy(), codes, centres)
+    clusters = pd.Categorical(_df["Cluster_Location"], categories=zones).codes
+    return grid_bins(x, y, codes, clusters, locations, zones, cell_size)
+
+def hotspot_bins(df, zones, cell_size=CELL_SIZE):
+    """Binned case counts for a versioned dataset with a Cluster_Location column, computed once per version."""
+    return _hotspot_bins(dataset_version(df), df, tuple(zones), cell_size)
+
+def hotspot_figure(bins):
+    """Plotly map of the bin aggregates: one marker per occupied cell, sized by cases, coloured by zone."""
+    fig = px.scatter(
+        bins, x="x", y="y", size="Cases", color="Cluster_Location",
+        hover_data={"Location": True, "Cases": True, "x": False, "y": False},
+        size_max=30,
+    )
+    labels = {location: LOCATION_COORDINATES[location] for location in bins["Location"].unique()}
+    fig.add_scatter(
+        x=[xy[0] for xy in labels.values()], y=[xy[1] + DISTRICT_RADIUS + 0.3 for xy in labels.values()],
+        text=list(labels), mode="text", showlegend=False, hoverinfo="skip",
+    )
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False, scaleanchor="x")
+    fig.update_layout(legend_title_text="Hotspot", margin=dict(l=0, r=0, t=30, b=0))
+    return fig
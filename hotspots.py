@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans
+from sklearn.metrics import calinski_harabasz_score, silhouette_score
+from compute_pool import compute
+
+# Set environment variable for KMeans (to avoid warnings)
+os.environ["OMP_NUM_THREADS"] = "1"
+
+# Scores candidate cluster counts side by side; separate from the compute pool, which
+# may itself be running the selection
+_selection_executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="hotspot-k")
+
+# Centroids of the latest fit per named stream of refits (e.g. one player's games);
+# the next fit in the stream is matched to them. Least recently used streams are dropped.
+_anchors = OrderedDict()
+_anchors_lock = threading.Lock()
+MAX_STREAMS = 4096
+
+def canonical_order(centroids):
+    """Permutation sorting centroids lexicographically (first feature, then second, ...)."""
+    return np.lexsort(np.asarray(centroids).T[::-1])
+
+def match_centroids(previous, centroids):
+    """order such that centroids[order[i]] is the new centroid closest to previous[i] (Hungarian assignment)."""
+    cost = ((np.asarray(previous)[:, None, :] - np.asarray(centroids)[None, :, :]) ** 2).sum(axis=-1)
+    rows, columns = linear_sum_assignment(cost)
+    return columns[np.argsort(rows)]
+
+def _relabel(kmeans, order):
+    # order[i] is the fitted cluster that becomes label i
+    new_label = np.empty_like(order)
+    new_label[order] = np.arange(len(order))
+    kmeans.cluster_centers_ = kmeans.cluster_centers_[order]
+    kmeans.labels_ = new_label[kmeans.labels_]
+    return kmeans
+
+def _fit(features, n_clusters, previous):
+    if previous is not None:
+        # Warm start: a refit on similar data converges in a few iterations from the old centroids
+        kmeans = KMeans(n_clusters=n_clusters, init=previous, n_init=1, random_state=42)
+        kmeans.fit(features)
+        return _relabel(kmeans, match_centroids(previous, kmeans.cluster_centers_))
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+    kmeans.fit(features)
+    return _relabel(kmeans, canonical_order(kmeans.cluster_centers_))
+
+def features_key(features):
+    """Content hash of a feature table, so equal tables from any session share one fit."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(features, index=False).to_numpy().tobytes())
+    digest.update(repr(list(features.columns)).encode())
+    return digest.hexdigest()
+
+def fit_hotspots(features, n_clusters=3, stream=None):
+    """Fit the crime hotspot KMeans model on the compute pool; read cluster ids from .labels_.
+
+    Labels are stable: cluster 0 is the one with the lowest centroid, and so on.
+    Fits that share a stream name (e.g. every new dataset in one player's
+    session) are instead warm-started from, and matched to, the previous fit's
+    centroids, so a zone keeps its label and hint from one dataset to the next.
+    Streams must not be shared between players, or one player's labels would
+    follow another's fits. One fitted model per distinct feature table (and
+    anchor) is kept and shared by every page and session.
+    """
+    anchor = (stream, tuple(features.columns), n_clusters)
+    previous = None
+    if stream is not None:
+        with _anchors_lock:
+            previous = _anchors.get(anchor)
+    # The result depends on the anchor it was matched to, so the anchor is part of the key
+    anchor_key = None if previous is None else hashlib.sha1(np.ascontiguousarray(previous).tobytes()).hexdigest()
+    key = ("hotspots", features_key(features), n_clusters, anchor_key)
+    kmeans = compute(key, _fit, features, n_clusters, previous)
+    if stream is not None:
+        with _anchors_lock:
+            _anchors[anchor] = kmeans.cluster_centers_
+            _anchors.move_to_end(anchor)
+            while len(_anchors) > MAX_STREAMS:
+                _anchors.popitem(last=False)
+    return kmeans
+
+def zone_name(label):
+    return f"High-Risk Zone {chr(65 + label)}"
+
+def _score_k(sample, k):
+    labels = KMeans(n_clusters=k, random_state=42, n_init='auto').fit_predict(sample)
+    return silhouette_score(sample, labels), calinski_harabasz_score(sample, labels)
+
+def _choose_n_clusters(features, k_range, sample_size):
+    values = features.to_numpy(dtype=np.float64)
+    # Both scores are computed on a bounded sample: silhouette is O(s^2) in the sample size
+    if len(values) > sample_size:
+        values = values[np.random.default_rng(42).choice(len(values), sample_size, replace=False)]
+    distinct = len(np.unique(values, axis=0))
+    candidates = [k for k in k_range if 2 <= k < distinct]
+    if not candidates:
+        return max(min(k_range[0], distinct), 1)
+    scores = np.array(list(_selection_executor.map(lambda k: _score_k(values, k), candidates)))
+    # Rank candidates on each score and take the best average rank; silhouette breaks ties
+    ranks = scores.argsort(axis=0).argsort(axis=0).sum(axis=1)
+    best = np.flatnonzero(ranks == ranks.max())
+    return candidates[best[np.argmax(scores[best, 0])]]
+
+def choose_n_clusters(features, version=None, k_range=range(2, 7), sample_size=2000):
+    """Number of hotspots that best fits the data, by sampled silhouette and Calinski-Harabasz scores.
+
+    Every k in k_range (capped below the number of distinct points) is scored in
+    parallel. The choice is computed once per dataset version, or per feature
+    table content when no version is given.
+    """
+    key = ("n_clusters", version or features_key(features), tuple(features.columns), tuple(k_range), sample_size)
+    return compute(key, _choose_n_clusters, features, list(k_range), sample_size)
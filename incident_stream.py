@@ -0,0 +1,380 @@
+import asyncio
+import codecs
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Same city as the "AI to the Rescue" hotspot game (app2.py)
+LOCATIONS = ["Downtown", "City Park", "Suburbs", "Industrial Area", "Mall"]
+CRIME_TYPES = ["Robbery", "Assault", "Burglary", "Fraud", "Arson"]
+GENDERS = ["Male", "Female"]
+ZONES = ["High-Risk Zone A", "High-Risk Zone B", "High-Risk Zone C"]
+
+FEED_PATH = "incidents.csv"
+# Local TCP port for socket feeders. Off unless DETECTIVE_FEED_PORT is set (e.g. 8765)
+FEED_PORT = int(os.environ["DETECTIVE_FEED_PORT"]) if os.environ.get("DETECTIVE_FEED_PORT") else None
+# The simulator starts the feed file over once it grows past this size
+MAX_FEED_BYTES = 50 << 20
+
+logger = logging.getLogger(__name__)
+
+# Incident records are one CSV line each: unix seconds,location,crime type,age,gender
+#   1718000000.25,Downtown,Robbery,34,Male
+
+def format_incident(ts, location, crime_type, age, gender):
+    return f"{ts:.2f},{location},{crime_type},{age},{gender}\n"
+
+
+class IncidentWindow:
+    """The last window_seconds of incidents (at most capacity of them) with running statistics.
+
+    Incidents live in a ring buffer of integer-coded numpy columns. Every batch
+    of new incidents, and every batch of expired ones, is folded into the
+    per-location counts with np.bincount, so the cost of an update depends on the
+    batch size only, never on how many incidents the window holds.
+
+    Hotspots cluster locations by incident volume, as the games do with KMeans.
+    With only a handful of locations, one Lloyd step over the locations' shares
+    of the window per batch keeps the zones current at negligible cost.
+    """
+
+    def __init__(self, window_seconds=600, capacity=100_000, locations=LOCATIONS,
+                 crime_types=CRIME_TYPES, n_clusters=len(ZONES)):
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self.locations = list(locations)
+        self.crime_types = list(crime_types)
+        self._location_codes = {name: i for i, name in enumerate(self.locations)}
+        self._crime_codes = {name: i for i, name in enumerate(self.crime_types)}
+        self._gender_codes = {name: i for i, name in enumerate(GENDERS)}
+
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.location = np.zeros(capacity, dtype=np.int8)
+        self.crime_type = np.zeros(capacity, dtype=np.int8)
+        self.age = np.zeros(capacity, dtype=np.int8)
+        self.gender = np.zeros(capacity, dtype=np.int8)
+        self._start = 0   # ring position of the oldest incident
+        self.size = 0
+        self.ingested = 0
+        self.dropped = 0  # malformed lines
+
+        n_locations, n_types = len(self.locations), len(self.crime_types)
+        self.location_counts = np.zeros(n_locations, dtype=np.int64)
+        self.type_counts = np.zeros((n_locations, n_types), dtype=np.int64)
+        self.age_sums = np.zeros(n_locations, dtype=np.int64)
+        self.female_counts = np.zeros(n_locations, dtype=np.int64)
+        self.n_clusters = n_clusters
+        self.centroids = None
+        self.location_zone = np.zeros(n_locations, dtype=np.int64)
+
+        # Readers (the Streamlit panels) take snapshots from another thread
+        self._lock = threading.Lock()
+
+    def ingest_lines(self, lines):
+        """Parse raw CSV incident lines and add them as one batch."""
+        ts, location, crime_type, age, gender = [], [], [], [], []
+        for line in lines:
+            try:
+                t, loc, crime, a, g = line.rstrip("\n").split(",")
+                location.append(self._location_codes[loc])
+                crime_type.append(self._crime_codes[crime])
+                gender.append(self._gender_codes[g])
+                age.append(int(a))
+                ts.append(float(t))
+            except (ValueError, KeyError):
+                # Keep the columns the same length if the line failed half-way
+                del location[len(ts):], crime_type[len(ts):], gender[len(ts):], age[len(ts):]
+                self.dropped += 1
+        self.extend(np.array(ts), np.array(location), np.array(crime_type), np.array(age), np.array(gender))
+
+    def extend(self, ts, location, crime_type, age, gender):
+        """Add a batch of integer-coded incidents, in any order."""
+        n = len(ts)
+        if n == 0:
+            return
+        order = np.argsort(ts, kind="stable")
+        ts, location, crime_type, age, gender = (a[order] for a in (ts, location, crime_type, age, gender))
+        if n > self.capacity:
+            ts, location, crime_type, age, gender = (a[-self.capacity:] for a in (ts, location, crime_type, age, gender))
+            n = self.capacity
+        with self._lock:
+            self._evict(max(self.size + n - self.capacity, 0))
+            # Merged sources can deliver a batch older than incidents already held; those
+            # are sorted in with it, so the ring stays in time order
+            held = self._count_before(ts[0])
+            displaced = (self._start + held + np.arange(self.size - held)) % self.capacity
+            columns = [np.concatenate([column[displaced], batch]) for column, batch in zip(
+                (self.ts, self.location, self.crime_type, self.age, self.gender), (ts, location, crime_type, age, gender))]
+            merged = np.argsort(columns[0], kind="stable")
+            positions = (self._start + held + np.arange(len(merged))) % self.capacity
+            for column, values in zip((self.ts, self.location, self.crime_type, self.age, self.gender), columns):
+                column[positions] = values[merged]
+            self.size += n
+            self.ingested += n
+            self._fold(location, crime_type, age, gender, 1)
+            newest = self.ts[(self._start + self.size - 1) % self.capacity]
+            self._evict(self._count_before(newest - self.window_seconds))
+            self._update_zones()
+
+    def expire(self, now=None):
+        """Drop incidents older than the window at wall-clock time now, so an idle feed ages out too."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = self._count_before(now - self.window_seconds)
+            if expired:
+                self._evict(expired)
+                self._update_zones()
+
+    def _count_before(self, cutoff):
+        # The ring is kept in time order, so incidents older than cutoff are a prefix of it
+        low, high = 0, self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self.ts[(self._start + mid) % self.capacity] < cutoff:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _evict(self, n):
+        if n <= 0:
+            return
+        positions = (self._start + np.arange(n)) % self.capacity
+        self._fold(self.location[positions], self.crime_type[positions], self.age[positions], self.gender[positions], -1)
+        self._start = (self._start + n) % self.capacity
+        self.size -= n
+
+    def _fold(self, location, crime_type, age, gender, sign):
+        n_locations, n_types = self.type_counts.shape
+        location = np.asarray(location, dtype=np.int64)
+        self.location_counts += sign * np.bincount(location, minlength=n_locations)
+        joint = location * n_types + crime_type
+        self.type_counts += sign * np.bincount(joint, minlength=n_locations * n_types).reshape(n_locations, n_types)
+        self.age_sums += sign * np.bincount(location, weights=age, minlength=n_locations).astype(np.int64)
+        self.female_counts += sign * np.bincount(location, weights=gender, minlength=n_locations).astype(np.int64)
+
+    def _update_zones(self):
+        # Feature per location: its share of the window's incidents
+        total = self.location_counts.sum()
+        if total == 0:
+            return
+        share = self.location_counts / total
+        if self.centroids is None:
+            # Seed the zones from the spread of the first batch; later batches warm-start from them
+            self.centroids = np.quantile(share, np.linspace(1, 0, self.n_clusters))
+        self.location_zone = np.abs(share[:, None] - self.centroids[None, :]).argmin(axis=1)
+        for zone in range(len(self.centroids)):
+            members = self.location_zone == zone
+            if members.any():
+                self.centroids[zone] = share[members].mean()
+        # Zone A is always the busiest
+        order = np.argsort(-self.centroids, kind="stable")
+        self.centroids = self.centroids[order]
+        self.location_zone = np.argsort(order)[self.location_zone]
+
+    def summary(self):
+        """Per-location snapshot of the window: incident count, hotspot zone and hint statistics."""
+        with self._lock:
+            counts = self.location_counts.copy()
+            type_counts = self.type_counts.copy()
+            age_sums = self.age_sums.copy()
+            female = self.female_counts.copy()
+            zones = self.location_zone.copy()
+        seen = np.maximum(counts, 1)
+        return pd.DataFrame({
+            "Location": self.locations,
+            "Incidents": counts,
+            "Cluster_Location": [ZONES[zone] for zone in zones],
+            "Top_Crime": [self.crime_types[i] for i in type_counts.argmax(axis=1)],
+            "Average_Age": np.round(age_sums / seen, 1),
+            "Female_Share": np.round(female / seen, 2),
+        })
+
+    def recent(self, n=20):
+        """The newest n incidents, newest first, decoded for display."""
+        with self._lock:
+            n = min(n, self.size)
+            positions = (self._start + self.size - 1 - np.arange(n)) % self.capacity
+            columns = (self.ts[positions], self.location[positions], self.crime_type[positions],
+                       self.age[positions], self.gender[positions])
+        ts, location, crime_type, age, gender = columns
+        return pd.DataFrame({
+            "Time": pd.to_datetime(ts, unit="s").strftime("%I:%M:%S %p"),
+            "Location": pd.Categorical.from_codes(location, categories=self.locations),
+            "Crime_Type": pd.Categorical.from_codes(crime_type, categories=self.crime_types),
+            "Suspect_Age": age,
+            "Suspect_Gender": pd.Categorical.from_codes(gender, categories=GENDERS),
+        })
+
+
+def _split_lines(buffer, chunk):
+    """Complete lines in buffer + chunk, and the trailing partial line."""
+    data = buffer + chunk
+    end = data.rfind("\n") + 1
+    return data[:end].splitlines(), data[end:]
+
+async def feed_file(path, queue, poll_interval=0.05):
+    """Tail an incident file, putting each chunk of new lines on the queue (a stand-in for a broker).
+
+    Only incidents appended after the feed starts are read; a file that does not
+    exist yet is read from its beginning once it appears, and so is a file that
+    was truncated (see simulate_incidents).
+    """
+    existed = True
+    while True:
+        try:
+            handle = open(path, "rb")
+            break
+        except FileNotFoundError:
+            existed = False
+            await asyncio.sleep(poll_interval)
+    with handle:
+        if existed:
+            # Earlier incidents are long past the window; replaying them would only refill it with stale data
+            handle.seek(0, os.SEEK_END)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial = ""
+        while True:
+            chunk = handle.read(1 << 16)
+            if not chunk:
+                if os.fstat(handle.fileno()).st_size < handle.tell():
+                    handle.seek(0)
+                    decoder.reset()
+                    partial = ""
+                await asyncio.sleep(poll_interval)
+                continue
+            lines, partial = _split_lines(partial, decoder.decode(chunk))
+            if lines:
+                await queue.put(lines)
+
+async def serve_socket(queue, host="127.0.0.1", port=FEED_PORT):
+    """Accept incident lines from any number of local TCP feeders."""
+    async def handle(reader, writer):
+        partial = ""
+        while chunk := await reader.read(1 << 16):
+            lines, partial = _split_lines(partial, chunk.decode("utf-8"))
+            if lines:
+                await queue.put(lines)
+        writer.close()
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+async def consume(queue, window):
+    while True:
+        lines = await queue.get()
+        window.ingest_lines(lines)
+
+async def expire_periodically(window, interval=1.0):
+    while True:
+        await asyncio.sleep(interval)
+        window.expire()
+
+
+class IncidentFeed:
+    """Runs the ingestion pipeline on its own asyncio loop in a daemon thread.
+
+    Sources put batches of raw lines on a bounded queue; one consumer folds them
+    into the window, so a fast feeder is slowed down rather than buffered without
+    limit. Each task is supervised on its own: a source that fails (e.g. the
+    socket port is taken by another server process) is logged, reported in
+    status and retried later, while the other sources keep running.
+    """
+
+    def __init__(self, window, path=FEED_PATH, port=FEED_PORT, queue_size=256, retry_interval=30.0):
+        self.window = window
+        self.path = path
+        self.port = port
+        self.queue_size = queue_size
+        self.retry_interval = retry_interval
+        self.status = {}
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(),), name="incident-feed", daemon=True)
+        self._thread.start()
+
+    async def _supervise(self, name, start):
+        while True:
+            self.status[name] = "running"
+            try:
+                await start()
+            except Exception as error:
+                logger.warning("Incident feed %s failed, retrying in %.0fs: %s", name, self.retry_interval, error)
+                self.status[name] = f"failed: {error}"
+            else:
+                self.status[name] = "stopped"
+            await asyncio.sleep(self.retry_interval)
+
+    async def _run(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = {
+            "consumer": lambda: consume(queue, self.window),
+            "expiry": lambda: expire_periodically(self.window),
+            "file": lambda: feed_file(self.path, queue),
+        }
+        if self.port is not None:
+            tasks["socket"] = lambda: serve_socket(queue, port=self.port)
+        await asyncio.gather(*(self._supervise(name, start) for name, start in tasks.items()))
+
+
+def simulate_incidents(path=FEED_PATH, rate=1000, duration=600, seed=None, stop=None, max_bytes=MAX_FEED_BYTES):
+    """Append random incidents to the feed file at roughly rate per second (the live-training stand-in).
+
+    Runs for duration seconds (None: until stop is set). The file is started
+    over whenever it grows past max_bytes, so it never grows without bound.
+    """
+    rng = random.Random(seed)
+    stop = stop or threading.Event()
+    # Uneven location weights so there is a real hotspot to find
+    weights = [rng.random() ** 2 for _ in LOCATIONS]
+    started = time.time()
+    with open(path, "a", encoding="utf-8") as handle:
+        while (duration is None or time.time() - started < duration) and not stop.is_set():
+            now = time.time()
+            if handle.tell() > max_bytes:
+                handle.truncate(0)
+            batch = max(rate // 10, 1)
+            handle.write("".join(
+                format_incident(now, rng.choices(LOCATIONS, weights)[0], rng.choice(CRIME_TYPES),
+                                rng.randint(18, 50), rng.choice(GENDERS))
+                for _ in range(batch)
+            ))
+            handle.flush()
+            stop.wait(max(0.1 - (time.time() - now), 0))
+
+
+class IncidentSimulator:
+    """At most one simulate_incidents thread at a time, which can be stopped."""
+
+    def __init__(self, path=FEED_PATH):
+        self.path = path
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, rate=1000, duration=600):
+        """Start simulating unless already running; returns whether a new run started."""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=simulate_incidents, name="incident-simulator", daemon=True,
+                kwargs={"path": self.path, "rate": rate, "duration": duration, "stop": self._stop},
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+
+if __name__ == "__main__":
+    # python incident_stream.py [incidents per second]; runs until interrupted
+    simulate_incidents(rate=int(sys.argv[1]) if len(sys.argv) > 1 else 1000, duration=None)
@@ -0,0 +1,130 @@
+import json
+import os
+import random
+import sys
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "waste_catalog.json")
+SUPPORTED_VERSIONS = {1}
+
+ItemBank = namedtuple("ItemBank", ["name", "categories", "items", "item_ids", "category_codes"])
+
+@lru_cache(maxsize=None)
+def load_item_bank(name, path=CATALOG_PATH):
+    """Load one waste-sorting item bank once per process.
+
+    items is a tuple of item names indexed by id, item_ids maps names back to
+    ids, and category_codes[id] indexes categories with the item's correct bin.
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if raw.get("version") not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported catalog version {raw.get('version')!r} in {path}")
+
+    bank = raw["banks"][name]
+    categories = tuple(sys.intern(c) for c in bank["categories"])
+    category_ids = {c: i for i, c in enumerate(categories)}
+    rows = sorted(bank["items"], key=lambda item: item["id"])
+    if [row["id"] for row in rows] != list(range(len(rows))):
+        raise ValueError(f"Item ids of bank {name!r} in {path} must run 0..n-1 without gaps")
+
+    items = tuple(sys.intern(row["name"]) for row in rows)
+    return ItemBank(
+        name=name,
+        categories=categories,
+        items=items,
+        item_ids={item: i for i, item in enumerate(items)},
+        category_codes=np.array([category_ids[row["category"]] for row in rows], dtype=np.int8),
+    )
+
+
+class FenwickSampler:
+    """Draws index i with probability weights[i] / total; draws and weight updates are O(log n).
+
+    The binary indexed tree is kept in a plain list, which is faster than numpy
+    for the single-element reads and writes each step makes.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        self.n = len(weights)
+        self.weights = weights.tolist()
+        # tree[i] holds the sum of weights (i - lowbit(i), i], built in O(n) from prefix sums
+        prefix = np.concatenate([[0.0], np.cumsum(weights)])
+        index = np.arange(self.n + 1)
+        self.tree = (prefix - prefix[index - (index & -index)]).tolist()
+        self._top = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    @property
+    def total(self):
+        return self.prefix_sum(self.n)
+
+    def prefix_sum(self, count):
+        """Sum of the first count weights."""
+        total = 0.0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def update(self, i, weight):
+        delta = weight - self.weights[i]
+        self.weights[i] = weight
+        i += 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def sample(self, rng=random):
+        target = rng.random() * self.total
+        position = 0
+        step = self._top
+        while step:
+            # Skip whole subtrees whose weight lies below the target; <= also skips zero weights
+            if position + step <= self.n and self.tree[position + step] <= target:
+                position += step
+                target -= self.tree[position]
+            step >>= 1
+        return min(position, self.n - 1)
+
+
+class AdaptiveItemSampler:
+    """Per-player item picker that favours the items the player gets wrong.
+
+    An item's weight is its posterior mean error rate under a Beta prior
+    (prior_errors wrong out of prior_attempts), so unseen items start at the
+    prior rate, mastered items fade towards a small floor and missed items come
+    back more often. Recording an answer changes one weight in O(log n).
+    """
+
+    def __init__(self, n_items, prior_errors=1.0, prior_attempts=2.0, floor=0.05):
+        self.prior_errors = prior_errors
+        self.prior_attempts = prior_attempts
+        self.floor = floor
+        self.seen = np.zeros(n_items, dtype=np.int32)
+        self.errors = np.zeros(n_items, dtype=np.int32)
+        self._sampler = FenwickSampler(np.full(n_items, self._weight(0, 0)))
+
+    def _weight(self, errors, seen):
+        return max((errors + self.prior_errors) / (seen + self.prior_attempts), self.floor)
+
+    def error_rate(self, item):
+        return self._weight(int(self.errors[item]), int(self.seen[item]))
+
+    def draw(self, exclude=None, rng=random):
+        """An item id, never exclude (e.g. the item just shown) unless it is the only one."""
+        if exclude is None or self._sampler.n == 1:
+            return self._sampler.sample(rng)
+        weight = self._sampler.weights[exclude]
+        self._sampler.update(exclude, 0.0)
+        try:
+            return self._sampler.sample(rng)
+        finally:
+            self._sampler.update(exclude, weight)
+
+    def record(self, item, correct):
+        self.seen[item] += 1
+        self.errors[item] += not correct
+        self._sampler.update(item, self.error_rate(item))
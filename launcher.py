@@ -0,0 +1,47 @@
+import streamlit as st
+from theme import PLAYER_NAME_KEY
+
+# Hosts every game variant as a page of one Streamlit app. All pages run in the
+# same server process, so pandas/sklearn/scipy are imported once and the cached
+# datasets, fitted hotspot models (hotspots.py) and theme stylesheet are shared.
+#
+#   streamlit run launcher.py
+
+st.set_page_config(page_title="🔍 Statistical Detective Games", page_icon="🕵️", layout="wide")
+
+pages = {
+    "Statistical Detective": [
+        st.Page("finalgamefile.py", title="Statistical Detective", icon="🔎", url_path="statistical-detective", default=True),
+        st.Page("codechangenewnew.py", title="The Case of the Serial Suspect", icon="🕵️", url_path="serial-suspect"),
+        st.Page("app2.py", title="AI to the Rescue", icon="🤖", url_path="ai-to-the-rescue"),
+        st.Page("appp4.py", title="AI Predictions", icon="📈", url_path="ai-predictions"),
+        st.Page("app.py", title="Witness Reports", icon="👀", url_path="witness-reports"),
+        st.Page("app3.py", title="Crime Distribution", icon="📊", url_path="crime-distribution"),
+        st.Page("statisticaldetective1234.py", title="Interrogation Room", icon="🗣️", url_path="interrogation-room"),
+        st.Page("live_hotspots.py", title="Live Crime Hotspots", icon="📡", url_path="live-hotspots"),
+    ],
+    "Mystery Solvers": [
+        st.Page("statsrace.py", title="Logical Deduction Challenge", icon="🧩", url_path="logical-deduction"),
+        st.Page("new_game.py", title="Mystery Solver", icon="🔍", url_path="mystery-solver"),
+        st.Page("new_game_extr.py", title="Sustainability Crime Solver", icon="🌱", url_path="sustainability-crime-solver"),
+    ],
+    "Waste Sorting": [
+        st.Page("rwaste.py", title="Waste Sorting Challenge", icon="♻️", url_path="waste-sorting"),
+        st.Page("randomwaste.py", title="Statistical Waste Sorting", icon="🗑️", url_path="statistical-waste-sorting"),
+    ],
+}
+
+# Keys that keep their meaning across games; everything else is game progress
+SHARED_STATE_KEYS = {PLAYER_NAME_KEY, "active_page"}
+
+page = st.navigation(pages)
+
+# The games reuse the same session_state keys (selected_case, attempts, score, ...)
+# with different contents, so switching pages starts the new game from a clean slate
+if st.session_state.get("active_page") != page.url_path:
+    for key in list(st.session_state.keys()):
+        if key not in SHARED_STATE_KEYS:
+            del st.session_state[key]
+    st.session_state.active_page = page.url_path
+
+page.run()
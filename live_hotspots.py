@@ -0,0 +1,66 @@
+import streamlit as st
+from incident_stream import FEED_PATH, FEED_PORT, IncidentFeed, IncidentSimulator, IncidentWindow
+from theme import apply_theme
+
+# Live-training mode: incidents are appended to incidents.csv by a feeder, e.g.
+#
+#   python incident_stream.py 5000
+#
+# (or sent to a local socket, when DETECTIVE_FEED_PORT is set) and the panels
+# below refresh on a timer without rerunning the page.
+
+st.set_page_config(layout="wide")  # Wide layout for better display
+apply_theme()
+
+st.title("📡 Live Crime Hotspots")
+st.write("Incidents stream in as they are reported. Watch the hotspots shift and spot the patterns!")
+
+REFRESH_SECONDS = 2
+
+@st.cache_resource  # One ingestion pipeline per server process, shared by every session
+def start_feed():
+    return IncidentFeed(IncidentWindow(window_seconds=600), path=FEED_PATH, port=FEED_PORT)
+
+SIMULATION_MINUTES = 10
+
+@st.cache_resource  # One simulator per server process, however many sessions press the button
+def get_simulator():
+    return IncidentSimulator(FEED_PATH)
+
+feed = start_feed()
+window = feed.window
+
+with st.sidebar:
+    st.header("📡 Feed")
+    st.write(f"Tailing `{FEED_PATH}`" + (f" and listening on port {feed.port}." if feed.port is not None else "."))
+    for source, status in feed.status.items():
+        if status.startswith("failed"):
+            st.warning(f"Feed {source} {status}")
+    simulator = get_simulator()
+    if simulator.running:
+        if st.button("Stop simulated feed"):
+            simulator.stop()
+            st.rerun()
+    elif st.button(f"Start simulated feed ({SIMULATION_MINUTES} minutes)"):
+        simulator.start(rate=1000, duration=SIMULATION_MINUTES * 60)
+        st.rerun()
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def hotspot_panel():
+    summary = window.summary()
+    st.write(f"🔢 Incidents in the last {window.window_seconds // 60} minutes: {window.size} "
+             f"({window.ingested} received, {window.dropped} malformed)")
+    st.write("AI-Detected Crime Hotspots:")
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+    if window.size:
+        busiest = summary.loc[summary["Incidents"].idxmax()]
+        st.write(f"📍 {busiest['Location']} is the busiest area right now, mostly {busiest['Top_Crime'].lower()} "
+                 f"with suspects around {busiest['Average_Age']:.0f} years old.")
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def incident_panel():
+    st.write("🚨 Latest reports:")
+    st.dataframe(window.recent(20), use_container_width=True, hide_index=True)
+
+hotspot_panel()
+incident_panel()
@@ -1,5 +1,7 @@
 import streamlit as st
 import random
+from score_store import get_score_store
+from theme import player_name_input, player_name
 
 st.set_page_config(layout="wide")
 
@@ -52,6 +54,12 @@ if "case" not in st.session_state:
 if "score" not in st.session_state:
     st.session_state.score = 0
 
+# Persistent leaderboard across sessions
+player_name_input()
+st.sidebar.subheader("🏆 Leaderboard")
+for rank, (player, total, plays) in enumerate(get_score_store().top_players("sustainability-crime-solver", 5), start=1):
+    st.sidebar.write(f"{rank}. {player}: {total:g} points ({plays} solved)")
+
 case = st.session_state.case
 
 st.subheader(f"🚨 Case: {case['crime']} at {case['location']}")
@@ -79,6 +87,8 @@ if st.button("🔒 Submit Final Answer"):
     if correct:
         st.success("🎉 Correct! You solved the case and won a treat! 🍬")
         st.session_state.score += 1
+        if player_name():
+            get_score_store().record(player_name(), "sustainability-crime-solver", 1)
         st.balloons()
     else:
         case["attempts"] += 1
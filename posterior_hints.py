@@ -0,0 +1,97 @@
+import heapq
+import numpy as np
+
+# Age feedback categories, matching the messages shown after a wrong guess
+AGE_EXACT = "exact"
+AGE_CLOSE = "close"  # "Age estimate close but not exact" (within 5 years)
+AGE_OFF = "off"      # "Age estimate significantly off" (more than 5 years away)
+AGE_TOLERANCE = 5
+
+def build_prior_counts(location_codes, ages, gender_codes, n_locations, n_genders, age_min=18, age_max=50, smoothing=0.5):
+    """Build the (location, age, gender) frequency table from the dataset columns in one pass."""
+    n_ages = age_max - age_min + 1
+    location_codes = np.asarray(location_codes, dtype=np.int64)
+    ages = np.clip(np.asarray(ages, dtype=np.int64), age_min, age_max) - age_min
+    gender_codes = np.asarray(gender_codes, dtype=np.int64)
+    flat = (location_codes * n_ages + ages) * n_genders + gender_codes
+    counts = np.bincount(flat, minlength=n_locations * n_ages * n_genders).astype(np.float64)
+    # Smoothing keeps unseen combinations possible instead of ruling them out
+    counts += smoothing
+    return counts.reshape(n_locations, n_ages, n_genders)
+
+
+class PosteriorHintEngine:
+    """Tracks the probability of every (location, age, gender) profile for one case.
+
+    Feedback only ever rules profiles out, so the relative order of the remaining
+    weights never changes. The heap is built once and stale entries are skipped
+    lazily, which keeps top_k at O(k log n) per call.
+    """
+
+    def __init__(self, prior_counts, age_min=18):
+        self.weights = np.array(prior_counts, dtype=np.float64)
+        self.age_min = age_min
+        self.total = float(self.weights.sum())
+        self._heap = [(-float(w), idx) for idx, w in enumerate(self.weights.ravel()) if w > 0]
+        heapq.heapify(self._heap)
+
+    def _eliminate(self, index):
+        """Zero out every profile selected by an index into the table."""
+        removed = self.weights[index]
+        self.total -= float(removed.sum())
+        self.weights[index] = 0.0
+
+    def observe(self, location, age, gender, location_match, age_status, gender_match):
+        """Apply the feedback from one guess; location and gender are integer codes."""
+        n_locations, n_ages, n_genders = self.weights.shape
+        age_index = age - self.age_min
+
+        loc_mask = np.zeros(n_locations, dtype=bool)
+        loc_mask[location] = True
+        if location_match:
+            loc_mask = ~loc_mask
+        self._eliminate(np.s_[loc_mask, :, :])
+
+        offsets = np.abs(np.arange(n_ages) - age_index)
+        if age_status == AGE_EXACT:
+            age_mask = offsets != 0
+        elif age_status == AGE_CLOSE:
+            age_mask = (offsets == 0) | (offsets > AGE_TOLERANCE)
+        else:
+            age_mask = offsets <= AGE_TOLERANCE
+        self._eliminate(np.s_[:, age_mask, :])
+
+        gender_mask = np.zeros(n_genders, dtype=bool)
+        gender_mask[gender] = True
+        if gender_match:
+            gender_mask = ~gender_mask
+        self._eliminate(np.s_[:, :, gender_mask])
+
+    def probability(self, location, age, gender):
+        if self.total <= 0:
+            return 0.0
+        return self.weights[location, age - self.age_min, gender] / self.total
+
+    def top_k(self, k=3):
+        """Return up to k (location, age, gender, probability) tuples, most likely first."""
+        flat = self.weights.ravel()
+        found = []
+        while self._heap and len(found) < k:
+            neg_weight, idx = heapq.heappop(self._heap)
+            # Entries for profiles ruled out since the heap was built are dropped for good
+            if flat[idx] > 0:
+                found.append((neg_weight, idx))
+        for entry in found:
+            heapq.heappush(self._heap, entry)
+
+        results = []
+        for neg_weight, idx in found:
+            location, age_index, gender = np.unravel_index(idx, self.weights.shape)
+            results.append((int(location), int(age_index) + self.age_min, int(gender), -neg_weight / self.total))
+        return results
+
+    def marginal(self, axis):
+        """Probability of each value along one axis: 0 = location, 1 = age, 2 = gender."""
+        other_axes = tuple(a for a in range(3) if a != axis)
+        totals = self.weights.sum(axis=other_axes)
+        return totals / self.total if self.total > 0 else totals
@@ -1,36 +1,38 @@
 import streamlit as st
-import random
+from collections import deque
+from item_bank import load_item_bank
+from skill_ratings import get_skill_model
+from theme import player_name_input, player_name
+
+GAME = "statistical-waste-sorting"
+
+def current_player():
+    # Players who leave the name empty share one "guest" rating
+    return player_name() or "guest"
 
 def get_waste_item():
-    """Returns a random waste item and its correct category."""
-    waste_items = {
-        "Plastic Bottle": "Recyclable",
-        "Banana Peel": "Compostable",
-        "Aluminum Can": "Recyclable",
-        "Glass Jar": "Recyclable",
-        "Pizza Box (Greasy)": "Compostable",
-        "Paper Cup": "Compostable",
-        "Styrofoam Container": "Non-Recyclable",
-        "Metal Spoon": "Recyclable",
-        "Tea Bag": "Compostable",
-        "Chip Bag": "Non-Recyclable",
-        "Cardboard Box": "Recyclable",
-        "Cotton Cloth": "Compostable",
-        "Plastic Straw": "Non-Recyclable",
-        "Egg Shells": "Compostable",
-        "Old Newspaper": "Recyclable",
-        "Expired Medication": "Non-Recyclable",
-        "Wooden Chopsticks": "Compostable",
-        "Broken Mirror": "Non-Recyclable",
-        "Milk Carton": "Recyclable"
-    }
-    item = random.choice(list(waste_items.keys()))
-    return item, waste_items[item]
+    """Returns a waste item pitched at the player's skill (about 70% chance of success), and its correct category."""
+    bank = load_item_bank(GAME)
+    model = get_skill_model(GAME)
+    if "recent_items" not in st.session_state:
+        st.session_state.recent_items = deque(maxlen=5)
+    # None of the last few items comes back straight away
+    item = model.recommend(current_player(), model.candidates(bank.name, bank.items), target=0.7,
+                           exclude=model.item_indices(st.session_state.recent_items))
+    name = model.items.names[item]
+    st.session_state.recent_items.append(name)
+    return name, bank.categories[bank.category_codes[bank.item_ids[name]]]
+
+def record_answer(waste_item, correct):
+    """Update the player's and the item's ratings."""
+    get_skill_model(GAME).update(current_player(), waste_item, correct)
 
 st.title("Statistical Waste Sorting Challenge")
 
 st.write("Sort the waste item into the correct category: Recyclable, Compostable, or Non-Recyclable.")
 
+player_name_input("Player name (to track your skill)")
+
 if 'score' not in st.session_state:
     st.session_state.score = 0
 if 'attempts' not in st.session_state:
@@ -45,6 +47,7 @@ if not st.session_state.game_over:
     user_choice = st.radio("Choose the correct category:", ["Recyclable", "Compostable", "Non-Recyclable"], key=st.session_state.attempts)
     
     if st.button("Submit") and not st.session_state.game_over:
+        record_answer(st.session_state.current_item, user_choice == st.session_state.correct_category)
         if user_choice == st.session_state.correct_category:
             st.success("Correct! Well done.")
             st.session_state.score += 1
@@ -1,35 +1,24 @@
 import streamlit as st
-import random
+from item_bank import load_item_bank, AdaptiveItemSampler
 import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+from chart_cache import cached_chart
+from waste_analytics import get_confusion_stats, draw_confusion_heatmap, draw_item_accuracy
 
 def get_waste_item():
-    """Returns a random waste item and its correct category."""
-    waste_items = {
-        "Plastic Bottle": "Recycling",
-        "Banana Peel": "Composting",
-        "Aluminum Can": "Recycling",
-        "Glass Jar": "Recycling",
-        "Pizza Box (Greasy)": "Composting",
-        "Paper Cup": "Composting",
-        "Styrofoam Container": "Landfill",
-        "Metal Spoon": "Recycling",
-        "Tea Bag": "Composting",
-        "Chip Bag": "Landfill",
-        "Cardboard Box": "Recycling",
-        "Cotton Cloth": "Organic Waste",
-        "Plastic Straw": "Landfill",
-        "Egg Shells": "Composting",
-        "Old Newspaper": "Recycling",
-        "Expired Medication": "Hazardous Waste",
-        "Wooden Chopsticks": "Composting",
-        "Broken Mirror": "Landfill",
-        "Milk Carton": "Recycling"
-    }
-    item = random.choice(list(waste_items.keys()))
-    return item, waste_items[item]
+    """Returns a waste item, favouring ones the player tends to get wrong, and its correct category."""
+    bank = load_item_bank("waste-sorting")
+    if "item_sampler" not in st.session_state:
+        st.session_state.item_sampler = AdaptiveItemSampler(len(bank.items))
+    # Never the same item twice in a row
+    current = bank.item_ids.get(st.session_state.get("current_item"))
+    item = st.session_state.item_sampler.draw(exclude=current)
+    return bank.items[item], bank.categories[bank.category_codes[item]]
+
+def record_answer(waste_item, correct):
+    """Feed the result back into the player's item weights."""
+    bank = load_item_bank("waste-sorting")
+    st.session_state.item_sampler.record(bank.item_ids[waste_item], correct)
 
 def save_data(waste_item, user_choice, correct_category):
     """Save the game data to a CSV file in the current working directory."""
@@ -43,14 +32,15 @@ def save_data(waste_item, user_choice, correct_category):
         data.to_csv(file_name, mode='w', header=True, index=False)
 
 def show_statistics():
-    """Display player performance statistics from the CSV file."""
-    file_name = "waste_sorting_data.csv"
-    if os.path.exists(file_name):
-        df = pd.read_csv(file_name)
-        accuracy = df.groupby("Waste Item")["Correct"].mean() * 100
-        
+    """Display player performance statistics from the latest analytics snapshot."""
+    stats = get_confusion_stats("waste-sorting")
+    stats.snapshot()
+    version = stats.snapshot_version()
+    if version is not None:
         st.write("### Player Performance Stats:")
-        st.bar_chart(accuracy)
+        st.image(cached_chart(("waste_item_accuracy", stats.bank.name), version, draw_item_accuracy(stats)))
+        st.write("### Where Each Category Ends Up:")
+        st.image(cached_chart(("waste_confusion", stats.bank.name), version, draw_confusion_heatmap(stats)))
 
 st.title("Waste Sorting Challenge")
 
@@ -71,6 +61,8 @@ if not st.session_state.game_over:
     
     if st.button("Submit") and not st.session_state.game_over:
         save_data(st.session_state.current_item, user_choice, st.session_state.correct_category)
+        record_answer(st.session_state.current_item, user_choice == st.session_state.correct_category)
+        get_confusion_stats("waste-sorting").record(st.session_state.current_item, user_choice)
         
         if user_choice == st.session_state.correct_category:
             st.success("Correct! Well done.")
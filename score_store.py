@@ -0,0 +1,161 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+# Next to the code rather than the working directory, so every launch shares one leaderboard;
+# DETECTIVE_DB_PATH overrides it
+DB_PATH = os.environ.get("DETECTIVE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "detective_scores.db"))
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    points REAL NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_player_game_ts ON scores (player, game, ts);
+
+-- Running totals per (player, game), kept up to date by every flush so the
+-- leaderboard never has to aggregate the raw scores table
+CREATE TABLE IF NOT EXISTS leaderboard (
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    total REAL NOT NULL,
+    plays INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (player, game)
+);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_game_total ON leaderboard (game, total DESC);
+"""
+
+INSERT_SCORE = "INSERT INTO scores (player, game, points, ts) VALUES (?, ?, ?, ?)"
+UPSERT_LEADERBOARD = """
+INSERT INTO leaderboard (player, game, total, plays, last_ts) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (player, game) DO UPDATE SET
+    total = total + excluded.total,
+    plays = plays + excluded.plays,
+    last_ts = MAX(last_ts, excluded.last_ts)
+"""
+TOP_PLAYERS = "SELECT player, total, plays FROM leaderboard WHERE game = ? ORDER BY total DESC, last_ts ASC LIMIT ?"
+
+
+class ScoreStore:
+    """Persistent scores and leaderboard on one WAL-mode SQLite connection per process.
+
+    record() only appends to an in-memory buffer. A background thread writes the
+    buffer in one transaction with executemany every flush_interval seconds, or
+    as soon as record() finds it has reached batch_size. Each flush also folds
+    the batch into the leaderboard table; a batch that fails to commit is put
+    back in the buffer and retried with the next flush. Cached top-N results are
+    dropped after a flush here or a commit by any other process (PRAGMA
+    data_version).
+    """
+
+    def __init__(self, path=DB_PATH, batch_size=500, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._buffer_lock = threading.Lock()
+        self._buffer = []
+        self._version = 0
+        self._top_cache = {}
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="score-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def record(self, player, game, points):
+        with self._buffer_lock:
+            self._buffer.append((player, game, float(points), time.time()))
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            # Written by the flusher, so a database error never raises into the game
+            self._wake.set()
+
+    def flush(self):
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        totals = {}
+        for player, game, points, ts in batch:
+            total, plays, last_ts = totals.get((player, game), (0.0, 0, ts))
+            totals[(player, game)] = (total + points, plays + 1, max(last_ts, ts))
+
+        with self._db_lock:
+            try:
+                if self._conn.in_transaction:
+                    # Left open by a rollback that itself failed
+                    self._conn.execute("ROLLBACK")
+                self._conn.execute("BEGIN")
+                self._conn.executemany(INSERT_SCORE, batch)
+                self._conn.executemany(UPSERT_LEADERBOARD, [key + value for key, value in totals.items()])
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                # Keep the scores, before the rollback can fail too: back in front of
+                # anything recorded meanwhile, in order
+                with self._buffer_lock:
+                    self._buffer[:0] = batch
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._version += 1
+
+    def _flush_periodically(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as error:
+                logger.warning("Score flush failed, retrying: %s", error)
+
+    def top_players(self, game, limit=10):
+        """Top-N (player, total, plays) rows for a game, cached until the database changes."""
+        key = (game, limit)
+        with self._db_lock:
+            # data_version only moves on other connections' commits, _version on this one's
+            version = (self._version, self._conn.execute("PRAGMA data_version").fetchone()[0])
+            cached = self._top_cache.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = self._conn.execute(TOP_PLAYERS, (game, limit)).fetchall()
+        self._top_cache[key] = (version, rows)
+        return rows
+
+    def player_history(self, player, game, limit=20):
+        """Most recent (points, ts) rows for one player, newest first."""
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT points, ts FROM scores WHERE player = ? AND game = ? ORDER BY ts DESC LIMIT ?",
+                (player, game, limit),
+            ).fetchall()
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+@lru_cache(maxsize=None)
+def get_score_store(path=DB_PATH):
+    """The process-wide store for a database file."""
+    return ScoreStore(path)
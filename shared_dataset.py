@@ -0,0 +1,223 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Memory-backed on Linux, so a published dataset lives in the page cache exactly once
+# and every server process maps the same pages
+SHARED_DIR = os.environ.get(
+    "DETECTIVE_SHARED_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "statistical-detective"),
+)
+ALIGNMENT = 64
+MANIFEST_VERSION = 2
+
+
+def _paths(dataset_id, directory):
+    base = os.path.join(directory, dataset_id)
+    return base + ".bin", base + ".json", base + ".lock"
+
+def generator_fingerprint(build, version=None):
+    """Hash of the source file defining build plus an explicit version (e.g. the column schema's).
+
+    Any change to the generator's code or to the version gives a new fingerprint,
+    so a dataset published by older code is never attached to by newer code.
+    """
+    digest = hashlib.sha1(f"{MANIFEST_VERSION}:{version}:{build.__module__}.{build.__qualname__}".encode())
+    try:
+        with open(inspect.getsourcefile(build), "rb") as f:
+            digest.update(f.read())
+    except (TypeError, OSError):
+        # Built-in or interactively defined: fall back to the bytecode
+        digest.update(build.__code__.co_code)
+    return digest.hexdigest()
+
+def schema_hash(columns):
+    """Hash of the column names, stored dtypes and category dtypes of a manifest."""
+    layout = [(c["name"], c["dtype"], c.get("category_dtype")) for c in columns]
+    return hashlib.sha1(json.dumps(layout).encode()).hexdigest()
+
+def _encode_categories(categories):
+    # Numeric, boolean and datetime labels keep their dtype; anything else is stored as text
+    dtype = categories.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        return dtype.str, categories.to_numpy().tolist()
+    if isinstance(dtype, np.dtype) and dtype.kind == "M":
+        return dtype.str, categories.to_numpy().view(np.int64).tolist()
+    return "str", [str(c) for c in categories]
+
+def _decode_categories(dtype, labels):
+    if dtype == "str":
+        return labels
+    dtype = np.dtype(dtype)
+    if dtype.kind == "M":
+        return np.array(labels, dtype=np.int64).view(dtype)
+    return np.array(labels, dtype=dtype)
+
+def publish(df, dataset_id, directory=SHARED_DIR, generator=None):
+    """Write a dataset's columns once into a shared memory-mapped file plus a JSON manifest.
+
+    Categorical and string columns are stored as their integer codes with the
+    labels (and their dtype) in the manifest; numeric columns are stored as-is.
+    The manifest also records the generator fingerprint and a hash of the
+    column layout, and is renamed into place last, so a dataset is visible only
+    once it is complete.
+    """
+    os.makedirs(directory, exist_ok=True)
+    data_path, manifest_path, _ = _paths(dataset_id, directory)
+
+    columns, arrays, offset = [], [], 0
+    for name in df.columns:
+        column = df[name]
+        entry = {"name": name}
+        if isinstance(column.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(column.dtype):
+            categorical = pd.Categorical(column)
+            values = categorical.codes
+            entry["category_dtype"], entry["categories"] = _encode_categories(categorical.categories)
+        else:
+            values = column.to_numpy()
+        entry.update(dtype=values.dtype.str, offset=offset)
+        columns.append(entry)
+        arrays.append(values)
+        offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+
+    temporary = f"{data_path}.{os.getpid()}.tmp"
+    mapped = np.memmap(temporary, dtype=np.uint8, mode="w+", shape=(max(offset, 1),))
+    for entry, values in zip(columns, arrays):
+        mapped[entry["offset"]:entry["offset"] + values.nbytes] = np.ascontiguousarray(values).view(np.uint8)
+    mapped.flush()
+    del mapped
+    os.replace(temporary, data_path)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "id": dataset_id,
+        "generator": generator,
+        "schema": schema_hash(columns),
+        "rows": len(df),
+        "columns": columns,
+        "attrs": {key: value for key, value in df.attrs.items() if isinstance(value, (str, int, float))},
+    }
+    temporary = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temporary, manifest_path)
+
+
+class StaleDatasetError(ValueError):
+    """The published dataset was written by a different generator or manifest layout."""
+
+
+class SharedDataset:
+    """Read-only numpy views onto a published dataset; attaching only maps the file."""
+
+    def __init__(self, dataset_id, directory=SHARED_DIR, generator=None):
+        data_path, manifest_path, _ = _paths(dataset_id, directory)
+        with open(manifest_path, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != MANIFEST_VERSION:
+            raise StaleDatasetError(f"Unsupported shared dataset manifest version {self.manifest.get('version')!r}")
+        if generator is not None and self.manifest.get("generator") != generator:
+            raise StaleDatasetError(f"Shared dataset {dataset_id!r} was published by a different generator")
+        if self.manifest.get("schema") != schema_hash(self.manifest["columns"]):
+            raise StaleDatasetError(f"Shared dataset {dataset_id!r} has an inconsistent column layout")
+        self.id = dataset_id
+        self.rows = self.manifest["rows"]
+        self._mapped = np.memmap(data_path, dtype=np.uint8, mode="r")
+        self.columns = {}
+        self.categories = {}
+        for entry in self.manifest["columns"]:
+            dtype = np.dtype(entry["dtype"])
+            self.columns[entry["name"]] = np.frombuffer(self._mapped, dtype=dtype, count=self.rows, offset=entry["offset"])
+            if "categories" in entry:
+                self.categories[entry["name"]] = _decode_categories(entry["category_dtype"], entry["categories"])
+
+    def to_frame(self):
+        """A DataFrame over the shared columns; numeric columns are not copied.
+
+        pandas takes its own copy of categorical codes, which are one or two
+        bytes per row, so a frame costs a fraction of generating the dataset.
+
+        The frame is new on every call, so callers may add or replace columns;
+        writing into an existing column's values raises, as the views are read-only.
+        """
+        data = {}
+        for name, values in self.columns.items():
+            if name in self.categories:
+                dtype = pd.CategoricalDtype(self.categories[name])
+                data[name] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+            else:
+                data[name] = values
+        df = pd.DataFrame(data, copy=False)
+        df.attrs.update(self.manifest["attrs"])
+        return df
+
+def _is_current(manifest_path, generator):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return False
+    return (manifest.get("version") == MANIFEST_VERSION and manifest.get("generator") == generator
+            and manifest.get("schema") == schema_hash(manifest["columns"]))
+
+def publish_once(dataset_id, build, version=None, directory=SHARED_DIR, timeout=60.0):
+    """Attach to dataset_id, having exactly one process build and publish it first.
+
+    The dataset is published under dataset_id plus the generator fingerprint
+    (see generator_fingerprint), so segments left in /dev/shm by older code are
+    never attached to; they are removed once the current one is published. A
+    manifest that does not match the fingerprint is republished.
+
+    The first process to create the lock file calls build() and publishes the
+    result; the others wait for the manifest to appear. A lock older than
+    timeout is treated as left behind by a crashed publisher and taken over.
+    """
+    generator = generator_fingerprint(build, version)
+    versioned_id = f"{dataset_id}.{generator[:16]}"
+    _, manifest_path, lock_path = _paths(versioned_id, directory)
+    os.makedirs(directory, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while not _is_current(manifest_path, generator):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                stale = time.time() - os.path.getmtime(lock_path) > timeout
+            except FileNotFoundError:
+                continue
+            if stale:
+                os.remove(lock_path)
+            elif time.monotonic() > deadline:
+                raise TimeoutError(f"Shared dataset {dataset_id!r} was not published within {timeout}s")
+            time.sleep(0.05)
+            continue
+        try:
+            os.close(fd)
+            if not _is_current(manifest_path, generator):
+                publish(build(), versioned_id, directory, generator)
+                _remove_other_versions(dataset_id, versioned_id, directory)
+        finally:
+            os.remove(lock_path)
+    return SharedDataset(versioned_id, directory, generator)
+
+def _remove_other_versions(dataset_id, versioned_id, directory):
+    # Processes already attached to an old version keep their mapping
+    unpublish(dataset_id, directory)  # unversioned, from before fingerprints
+    for manifest_path in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(dataset_id)}.*.json")):
+        other = os.path.basename(manifest_path)[:-len(".json")]
+        if other != versioned_id and other.count(".") == dataset_id.count(".") + 1:
+            unpublish(other, directory)
+
+def unpublish(dataset_id, directory=SHARED_DIR):
+    """Remove a published dataset; processes that already attached keep their mapping."""
+    for path in _paths(dataset_id, directory)[:2]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
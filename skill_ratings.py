@@ -0,0 +1,267 @@
+import atexit
+import logging
+import math
+import random
+import sqlite3
+import threading
+from functools import lru_cache
+import numpy as np
+from score_store import DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratings (
+    game TEXT NOT NULL,
+    kind TEXT NOT NULL,          -- 'player' or 'item'
+    name TEXT NOT NULL,
+    rating REAL NOT NULL,
+    answers INTEGER NOT NULL,
+    PRIMARY KEY (game, kind, name)
+);
+"""
+# Rows carry this process's changes since its last flush, so processes add to each
+# other's updates instead of overwriting them (new names start from a 0 rating)
+UPSERT_RATING = """
+INSERT INTO ratings (game, kind, name, rating, answers) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (game, kind, name) DO UPDATE SET rating = rating + excluded.rating, answers = answers + excluded.answers
+"""
+SELECT_RATING = "SELECT rating, answers FROM ratings WHERE game = ? AND kind = ? AND name = ?"
+
+logger = logging.getLogger(__name__)
+
+
+class RatingPool:
+    """Names mapped to slots in growable float32 rating / int32 answer-count arrays.
+
+    rating_changes and answer_changes hold what this process has added since
+    its last flush.
+    """
+
+    def __init__(self, capacity=1024):
+        self.ids = {}
+        self.names = []
+        self.ratings = np.zeros(capacity, dtype=np.float32)
+        self.answers = np.zeros(capacity, dtype=np.int32)
+        self.rating_changes = np.zeros(capacity, dtype=np.float64)
+        self.answer_changes = np.zeros(capacity, dtype=np.int32)
+
+    def index(self, name, rating=0.0, answers=0):
+        i = self.ids.get(name)
+        if i is None:
+            i = len(self.names)
+            if i == len(self.ratings):
+                # Double in place so appends stay amortised O(1)
+                self.ratings = np.concatenate([self.ratings, np.zeros_like(self.ratings)])
+                self.answers = np.concatenate([self.answers, np.zeros_like(self.answers)])
+                self.rating_changes = np.concatenate([self.rating_changes, np.zeros_like(self.rating_changes)])
+                self.answer_changes = np.concatenate([self.answer_changes, np.zeros_like(self.answer_changes)])
+            self.ids[name] = i
+            self.names.append(name)
+            self.ratings[i] = rating
+            self.answers[i] = answers
+        return i
+
+    def indices(self, names):
+        return np.array([self.index(name) for name in names], dtype=np.int64)
+
+
+class RatingIndex:
+    """A fixed set of items kept sorted by rating, for nearest-difficulty lookups.
+
+    A lookup is a binary search plus a walk outwards over the few closest
+    items; a rating change moves one item to its new place in the sorted
+    arrays (a search and a block shift), never re-sorting or scanning the set.
+    """
+
+    def __init__(self, items, ratings):
+        items = np.unique(np.asarray(items, dtype=np.int64))
+        order = np.argsort(ratings[items], kind="stable")
+        self.items = items[order]
+        self.keys = ratings[self.items].astype(np.float64)
+        self.members = set(self.items.tolist())
+
+    def move(self, item, old, new):
+        if item not in self.members:
+            return
+        low, high = np.searchsorted(self.keys, old, "left"), np.searchsorted(self.keys, old, "right")
+        position = low + int(np.flatnonzero(self.items[low:high] == item)[0])
+        target = int(np.searchsorted(self.keys, new))
+        if target > position:
+            target -= 1
+            self.keys[position:target] = self.keys[position + 1:target + 1]
+            self.items[position:target] = self.items[position + 1:target + 1]
+        else:
+            self.keys[target + 1:position + 1] = self.keys[target:position]
+            self.items[target + 1:position + 1] = self.items[target:position]
+        self.keys[target] = new
+        self.items[target] = item
+
+    def nearest(self, target, k, exclude=()):
+        """Up to k items whose ratings are closest to target, skipping excluded items."""
+        right = int(np.searchsorted(self.keys, target))
+        left = right - 1
+        chosen = []
+        while len(chosen) < k and (left >= 0 or right < len(self.keys)):
+            if right >= len(self.keys) or (left >= 0 and target - self.keys[left] <= self.keys[right] - target):
+                item, left = int(self.items[left]), left - 1
+            else:
+                item, right = int(self.items[right]), right + 1
+            if item not in exclude:
+                chosen.append(item)
+        return chosen
+
+
+class SkillModel:
+    """Online 1-PL IRT (Rasch) ratings of players and items/cases for one game.
+
+    P(correct) = sigmoid(player ability - item difficulty). Each answer is one
+    SGD step on both ratings, O(1) whatever the number of players. Changed
+    ratings are written to the scores database in batches by a background
+    thread every flush_interval seconds, and loaded back on start-up.
+    """
+
+    def __init__(self, game, path=DB_PATH, learning_rate=0.4, item_learning_rate=0.1, flush_interval=1.0):
+        self.game = game
+        self.learning_rate = learning_rate
+        self.item_learning_rate = item_learning_rate
+        self.flush_interval = flush_interval
+        self.players = RatingPool()
+        self.items = RatingPool()
+        self._pools = {"player": self.players, "item": self.items}
+        self._dirty = set()
+        self._candidates = {}   # name -> RatingIndex over a fixed candidate set
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        for kind, name, rating, answers in self._conn.execute(
+            "SELECT kind, name, rating, answers FROM ratings WHERE game = ?", (game,)
+        ):
+            self._pools[kind].index(name, rating, answers)
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name=f"ratings-{game}", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def probability(self, player, item):
+        with self._lock:
+            ability = self.players.ratings[self.players.index(player)]
+            difficulty = self.items.ratings[self.items.index(item)]
+        return 1 / (1 + math.exp(difficulty - ability))
+
+    def update(self, player, item, correct):
+        """Apply one answer; returns the success probability the model predicted for it."""
+        with self._lock:
+            p, i = self.players.index(player), self.items.index(item)
+            expected = 1 / (1 + math.exp(float(self.items.ratings[i] - self.players.ratings[p])))
+            error = float(correct) - expected
+            for pool, slot, change in ((self.players, p, self.learning_rate * error),
+                                       (self.items, i, -self.item_learning_rate * error)):
+                self._set_rating(pool, slot, pool.ratings[slot] + change)
+                pool.answers[slot] += 1
+                pool.rating_changes[slot] += change
+                pool.answer_changes[slot] += 1
+            self._dirty.add(("player", p))
+            self._dirty.add(("item", i))
+        return expected
+
+    def _set_rating(self, pool, slot, rating):
+        # Called with the lock held; keeps every candidate index in rating order
+        old = float(pool.ratings[slot])
+        pool.ratings[slot] = rating
+        if pool is self.items:
+            for index in self._candidates.values():
+                index.move(slot, old, float(pool.ratings[slot]))
+
+    def candidates(self, name, items):
+        """The candidate index for a named item set (e.g. an item bank), built on first use."""
+        with self._lock:
+            index = self._candidates.get(name)
+            if index is None:
+                index = self._candidates[name] = RatingIndex(self.items.indices(items), self.items.ratings)
+            return index
+
+    def recommend(self, player, candidates, target=0.7, exclude=(), k=3, rng=random):
+        """A candidate item the player should get right with probability close to target.
+
+        candidates is a RatingIndex (see candidates) and exclude a collection of
+        item indices. One of the k closest matches is picked at random so
+        equally rated items take turns.
+        """
+        exclude = set(exclude)
+        with self._lock:
+            ability = float(self.players.ratings[self.players.index(player)])
+            # The ideal difficulty is ability - logit(target)
+            ideal = ability - math.log(target / (1 - target))
+            closest = candidates.nearest(ideal, k, exclude) or candidates.nearest(ideal, k)
+        return rng.choice(closest)
+
+    def item_indices(self, names):
+        with self._lock:
+            return self.items.indices(names)
+
+    def flush(self):
+        """Add the changes since the last flush to the database, then adopt its totals.
+
+        Reading the totals back brings in other processes' answers for the
+        flushed names. On failure the changes are kept for the next flush.
+        """
+        with self._lock:
+            dirty, self._dirty = list(self._dirty), set()
+            rows = []
+            for kind, i in dirty:
+                pool = self._pools[kind]
+                rows.append((self.game, kind, pool.names[i], float(pool.rating_changes[i]), int(pool.answer_changes[i])))
+                pool.rating_changes[i] = 0.0
+                pool.answer_changes[i] = 0
+        if not rows:
+            return
+        try:
+            if self._conn.in_transaction:
+                # Left open by a rollback that itself failed
+                self._conn.execute("ROLLBACK")
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(UPSERT_RATING, rows)
+                totals = [self._conn.execute(SELECT_RATING, row[:3]).fetchone() for row in rows]
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            # Put the changes back before anything else can fail, so they are never lost
+            with self._lock:
+                for (kind, i), (_, _, _, rating_change, answer_change) in zip(dirty, rows):
+                    pool = self._pools[kind]
+                    pool.rating_changes[i] += rating_change
+                    pool.answer_changes[i] += answer_change
+                self._dirty.update(dirty)
+            raise
+        with self._lock:
+            for (kind, i), (rating, answers) in zip(dirty, totals):
+                pool = self._pools[kind]
+                # Answers given here while the flush ran are still pending on top of the totals
+                self._set_rating(pool, i, rating + pool.rating_changes[i])
+                pool.answers[i] = answers + pool.answer_changes[i]
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as error:
+                logger.warning("Rating flush for %s failed, retrying: %s", self.game, error)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flusher.join()
+        self.flush()
+        self._conn.close()
+
+@lru_cache(maxsize=None)
+def get_skill_model(game, path=DB_PATH):
+    """The process-wide ratings for a game."""
+    return SkillModel(game, path)
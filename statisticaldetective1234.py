@@ -4,10 +4,17 @@ import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, timedelta
-from sklearn.cluster import KMeans
+from hotspots import fit_hotspots, choose_n_clusters, zone_name
+from crime_schema import apply_schema
+from case_catalog import load_catalog, evidence_order
+from case_timeline import build_case_timeline
+from suspect_roster import generate_rosters
 
 st.set_page_config(layout="wide")
 
+# Suspect, evidence and interrogation banks, loaded once per process
+catalog = load_catalog()
+
 # ---------- Game Setup ----------
 st.title("🕵️ Statistical Detective: AI to the Rescue")
 st.write("Analyze clues, interrogate suspects, and piece together the mystery. Not everything is as it seems...")
@@ -47,7 +54,7 @@ def generate_crime_data():
             "Outcome": random.choice(["Unsolved", "Solved"]),
         })
     
-    return pd.DataFrame(data)
+    return apply_schema(pd.DataFrame(data))
 
 df = generate_crime_data()
 
@@ -61,53 +68,46 @@ st.write(selected_case["Crime_Report"])
 st.write(f"📅 Date: {selected_case['Date']} | ⏰ Time: {selected_case['Time']} | 📍 Location: {selected_case['Location']}")
 
 # ---------- Enriched Suspect Profiles ----------
+genders = ["Male", "Female"]
+
+@st.cache_data  # One roster per case, drawn up front for the whole dataset
+def build_rosters(culprit_names):
+    culprit_ids = [catalog.suspect_ids[name] for name in culprit_names]
+    return generate_rosters(culprit_ids, len(catalog.suspects), n_genders=len(genders))
+
+rosters = build_rosters(tuple(df["Suspect_Name"]))
+
 def generate_suspects(case):
     """Generate a list of suspect profiles with detailed backgrounds and alibis."""
-    background_info = {
-        "John": "Has a history of petty theft but no major crimes.",
-        "Sarah": "Worked as a security guard at a local mall.",
-        "Mike": "Recently lost his job and has mounting financial troubles.",
-        "Emma": "A quiet person with few friends; often keeps to herself.",
-        "David": "Well-known in the community for charity work."
-    }
-    alibis = {
-        "John": "Claimed to have been at a local diner around the time of the crime.",
-        "Sarah": "Stated she was on a late shift at the mall.",
-        "Mike": "Said he was visiting a friend in a nearby town.",
-        "Emma": "Insisted she was at home, reading all evening.",
-        "David": "Mentioned he was out running errands."
-    }
-
-    culprit_name = case["Suspect_Name"]
+    row = df.index.get_loc(case.name)  # Position of the case in df, which is also its roster row
+    culprit_profile = catalog.suspects[rosters.culprits[row]]
     culprit = {
-        "Name": culprit_name,
+        "Name": culprit_profile.name,
         "Age": case["Suspect_Age"],
         "Gender": case["Suspect_Gender"],
         "Role": "Culprit",
-        "Background": background_info.get(culprit_name, "No background information available."),
-        "Alibi": alibis.get(culprit_name, "No alibi provided."),
+        "Background": culprit_profile.background,
+        "Alibi": culprit_profile.alibi,
     }
 
-    all_names = list(background_info.keys())
-    decoy_names = [name for name in all_names if name != culprit_name]
-    random.shuffle(decoy_names)  # Randomize order
-
     decoys = []
-    for i in range(2):
-        name = decoy_names[i]
+    for profile_id, age, gender in zip(rosters.decoys[row], rosters.decoy_ages[row], rosters.decoy_genders[row]):
+        profile = catalog.suspects[profile_id]
         decoys.append({
-            "Name": name,
-            "Age": random.randint(18, 50),
-            "Gender": random.choice(["Male", "Female"]),
+            "Name": profile.name,
+            "Age": int(age),
+            "Gender": genders[gender],
             "Role": "Decoy",
-            "Background": background_info.get(name, "No background information available."),
-            "Alibi": alibis.get(name, "No alibi provided."),
+            "Background": profile.background,
+            "Alibi": profile.alibi,
         })
 
     return [culprit] + decoys
 
 if "suspects" not in st.session_state:
     st.session_state.suspects = generate_suspects(selected_case)
+if "evidence_seed" not in st.session_state:
+    st.session_state.evidence_seed = random.getrandbits(32)
 
 st.subheader("👥 Suspect List (Detailed)")
 for suspect in st.session_state.suspects:
@@ -118,68 +118,31 @@ for suspect in st.session_state.suspects:
 
 # ---------- Interactive Evidence Board ----------
 st.subheader("🔎 Evidence Board")
-# Define a list of ambiguous evidence clues that do not always point to the culprit.
-evidence_items = [
-    {"title": "Fingerprint Analysis", "detail": "Fingerprints were found at the scene. The match is inconclusive; multiple profiles are similar."},
-    {"title": "DNA Sample", "detail": "DNA samples reveal partial matches from several individuals."},
-    {"title": "CCTV Footage", "detail": "Footage shows a figure in a hoodie, but the quality is too low to make a clear identification."},
-    {"title": "Time-stamped Call", "detail": "A call was placed near the crime scene. The caller's identity is uncertain."},
-    {"title": "Forensic Report", "detail": "Forensic analysis shows unusual chemical traces that could belong to anyone working in the area."},
-]
-
-# Randomize the order of clues each time the evidence board is shown.
-random.shuffle(evidence_items)
-for item in evidence_items:
-    with st.expander(item["title"]):
-        st.write(item["detail"])
+# Clues come from the catalog in a per-case order that stays fixed across reruns.
+for evidence_id in evidence_order(catalog, st.session_state.evidence_seed):
+    item = catalog.evidence[evidence_id]
+    with st.expander(item.title):
+        st.write(item.detail)
 
 # ---------- Timeline of Events ----------
 st.subheader("🕰️ Timeline of Events")
-timeline = [
-    {"time": selected_case["Time"], "event": "Crime reported at the scene."},
-    {"time": "11:30 PM", "event": "A suspicious call was made in the vicinity."},
-    {"time": "11:45 PM", "event": "CCTV captures multiple figures near the area."},
-    {"time": "12:15 AM", "event": "Forensic team arrives at the scene; unusual traces are found."},
-]
-# Randomly mix in an extra timeline event as a red herring.
-timeline.append({"time": "12:30 AM", "event": "A passerby reported seeing a different figure lurking nearby."})
-timeline = sorted(timeline, key=lambda x: x["time"])
-for event in timeline:
-    st.write(f"**{event['time']}**: {event['event']}")
+if "timeline" not in st.session_state:
+    st.session_state.timeline = build_case_timeline(selected_case["Time"])
+for time, event in st.session_state.timeline:
+    st.write(f"**{time}**: {event}")
 
 # ---------- Enhanced Interrogation Mechanics ----------
 st.subheader("🗣️ Interrogate Suspects")
-question_list = [
-    "Where were you last night?",
-    "Do you know the victim?",
-    "What were you doing at the crime scene?"
-]
-
-# Introduce more ambiguous interrogation responses.
-responses = {
-    "Where were you last night?": {
-        "Culprit": {"answer": "I was at home... though I did step out briefly. I might have been seen.", "cue": "😬 (Evasive)"},
-        "Decoy": {"answer": "I was home with my family all night, no one can dispute that.", "cue": "🙂 (Confident)"},
-    },
-    "Do you know the victim?": {
-        "Culprit": {"answer": "We were acquaintances; nothing more.", "cue": "😶 (Uncertain)"},
-        "Decoy": {"answer": "Yes, we even worked together at times.", "cue": "😊 (Relaxed)"},
-    },
-    "What were you doing at the crime scene?": {
-        "Culprit": {"answer": "I happened to be nearby; it's a coincidence.", "cue": "😕 (Ambiguous)"},
-        "Decoy": {"answer": "I wasn't anywhere near that area that night.", "cue": "😎 (Assertive)"},
-    }
-}
-
-suspect_names = [s["Name"] for s in st.session_state.suspects]
+suspects_by_name = {s["Name"]: s for s in st.session_state.suspects}
+suspect_names = list(suspects_by_name)
 selected_suspect_name = st.selectbox("Select a suspect to interrogate:", suspect_names, key="suspect_select")
-selected_suspect = next(s for s in st.session_state.suspects if s["Name"] == selected_suspect_name)
-selected_question = st.selectbox("Select a question to ask:", question_list, key="question_select")
+selected_suspect = suspects_by_name[selected_suspect_name]
+selected_question = st.selectbox("Select a question to ask:", [q.text for q in catalog.questions], key="question_select")
 
 if st.button("🎙️ Ask Question"):
     role = selected_suspect["Role"]
-    reply = responses[selected_question][role]
-    st.write(f"🕵️ {selected_suspect['Name']} answers: {reply['answer']} {reply['cue']}")
+    reply = catalog.responses[(catalog.question_ids[selected_question], role)]
+    st.write(f"🕵️ {selected_suspect['Name']} answers: {reply.answer} {reply.cue}")
 
 # ---------- AI-Assisted Crime Pattern Detection ----------
 st.subheader("📊 AI Crime Analysis")
@@ -190,9 +153,9 @@ weapon_map = {"Knife": 0, "Gun": 1, "None": 2}
 df["Weapon_Code"] = df["Weapon_Used"].map(weapon_map)
 
 # Cluster using both location and weapon information.
-kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
-df['Cluster'] = kmeans.fit_predict(df[["Location_Code", "Weapon_Code"]])
-df['Cluster_Location'] = df['Cluster'].map({0: "Hotspot A", 1: "Hotspot B", 2: "Hotspot C"})
+n_zones = choose_n_clusters(df[["Location_Code", "Weapon_Code"]])
+df['Cluster'] = fit_hotspots(df[["Location_Code", "Weapon_Code"]], n_clusters=n_zones).labels_
+df['Cluster_Location'] = df['Cluster'].map(zone_name)
 
 zone_hint = df[df['Location'] == selected_case['Location']]['Cluster_Location'].values[0]
 st.write(f"📍 Crime Zone: {zone_hint}")
@@ -212,4 +175,6 @@ if st.button("🚔 Submit Arrest Warrant"):
 if st.button("🔄 New Case"):
     st.session_state.selected_case = df.sample(1).iloc[0]
     st.session_state.suspects = generate_suspects(st.session_state.selected_case)
+    st.session_state.evidence_seed = random.getrandbits(32)
+    st.session_state.timeline = build_case_timeline(st.session_state.selected_case["Time"])
     st.experimental_rerun()
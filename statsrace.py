@@ -1,5 +1,7 @@
 import streamlit as st
 import random
+from score_store import get_score_store
+from theme import player_name_input, player_name
 
 st.set_page_config(layout="wide")
 
@@ -56,6 +58,12 @@ if "case" not in st.session_state:
 if "score" not in st.session_state:
     st.session_state.score = 0  # Track player score
 
+# Persistent leaderboard across sessions
+player_name_input()
+st.sidebar.subheader("🏆 Leaderboard")
+for rank, (player, total, plays) in enumerate(get_score_store().top_players("mystery-solver", 5), start=1):
+    st.sidebar.write(f"{rank}. {player}: {total:g} points ({plays} solved)")
+
 case = st.session_state.case
 
 # ---------- Calculate Probabilities ----------
@@ -152,10 +160,14 @@ if st.button("🔒 Submit Final Answer"):
         if correct and occupation_match and time_match:
             st.success("🎉 Perfect deduction! You identified the hidden patterns!")
             st.session_state.score += 1  # Increase score
+            if player_name():
+                get_score_store().record(player_name(), "mystery-solver", 1)
             st.balloons()
         elif correct:
             st.warning("✅ Correct suspect, but did you catch the full pattern? (Occupation + Time + Weapon)")
             st.session_state.score += 0.5  # Partial score
+            if player_name():
+                get_score_store().record(player_name(), "mystery-solver", 0.5)
         else:
             st.error("❌ Incorrect. The truth hides in: Occupation-Weapon match + Typical schedule")
     
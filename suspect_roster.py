@@ -0,0 +1,63 @@
+from collections import namedtuple
+import numpy as np
+
+# Upper bound on the random keys held at once when the decoys are a large share of
+# the pool (8 MB of float64); sparse draws only ever hold n_cases x n_decoys picks
+BLOCK_ELEMENTS = 1 << 20
+
+# All fields are integer arrays with one row per case; profile ids index the catalog's suspect table
+Rosters = namedtuple("Rosters", ["culprits", "decoys", "decoy_ages", "decoy_genders"])
+
+def generate_rosters(culprit_ids, n_profiles, n_decoys=2, age_range=(18, 50), n_genders=2, seed=None):
+    """Draw decoy suspects for many cases at once.
+
+    Decoys are sampled without replacement from the profile pool minus the
+    culprit, vectorized over all cases: picks come from range(n_profiles - 1),
+    and anything at or above the culprit's id is shifted up by one, so the
+    culprit can never be drawn and no filtered copy of the pool is needed.
+    Only n_cases x n_decoys picks are drawn when decoys are at most half the
+    pool; larger shares use blocked random keys (see BLOCK_ELEMENTS), so
+    memory never grows with n_cases x n_profiles.
+    """
+    if n_decoys > n_profiles - 1:
+        raise ValueError(f"Cannot draw {n_decoys} decoys from a pool of {n_profiles} profiles")
+    rng = np.random.default_rng(seed)
+    culprits = np.asarray(culprit_ids, dtype=np.int32)
+    n_cases = len(culprits)
+
+    pool = n_profiles - 1
+    if n_decoys == 0:
+        picks = np.empty((n_cases, 0), dtype=np.int64)
+    elif 2 * n_decoys <= pool:
+        picks = _sparse_picks(rng, n_cases, pool, n_decoys)
+    else:
+        picks = _dense_picks(rng, n_cases, pool, n_decoys)
+    decoys = (picks + (picks >= culprits[:, None])).astype(np.int32)
+
+    decoy_ages = rng.integers(age_range[0], age_range[1] + 1, size=(n_cases, n_decoys), dtype=np.int16)
+    decoy_genders = rng.integers(0, n_genders, size=(n_cases, n_decoys), dtype=np.int8)
+    return Rosters(culprits, decoys, decoy_ages, decoy_genders)
+
+def _sparse_picks(rng, n_cases, pool, n_decoys):
+    # Draw with replacement and redraw only the rows that came out with a repeat; with
+    # at most half the pool per row, each round keeps a constant share of the rows
+    picks = rng.integers(0, pool, size=(n_cases, n_decoys))
+    redraw = np.arange(n_cases)
+    while len(redraw):
+        ordered = np.sort(picks[redraw], axis=1)
+        redraw = redraw[(ordered[:, 1:] == ordered[:, :-1]).any(axis=1)]
+        picks[redraw] = rng.integers(0, pool, size=(len(redraw), n_decoys))
+    return picks
+
+def _dense_picks(rng, n_cases, pool, n_decoys):
+    # Random keys per row, keeping the n_decoys smallest; rows go in blocks of
+    # about BLOCK_ELEMENTS keys, so memory stays bounded for any number of cases
+    picks = np.empty((n_cases, n_decoys), dtype=np.int64)
+    block = max(BLOCK_ELEMENTS // pool, 1)
+    for start in range(0, n_cases, block):
+        keys = rng.random((min(block, n_cases - start), pool))
+        chosen = np.argpartition(keys, n_decoys - 1, axis=1)[:, :n_decoys]
+        # argpartition leaves the chosen columns in no particular order; shuffle them per row
+        order = np.take_along_axis(keys, chosen, axis=1).argsort(axis=1)
+        picks[start:start + len(keys)] = np.take_along_axis(chosen, order, axis=1)
+    return picks
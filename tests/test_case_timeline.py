@@ -0,0 +1,23 @@
+from case_timeline import Timeline, build_case_timeline, format_clock, parse_clock
+
+
+def test_parse_and_format_round_trip():
+    for text in ["12:00 AM", "12:15 AM", "09:05 AM", "12:00 PM", "11:50 PM"]:
+        assert format_clock(parse_clock(text)) == text
+
+
+def test_events_on_the_next_day_sort_after_the_evening():
+    timeline = Timeline()
+    timeline.add("12:15 AM", "after midnight", day=1)
+    timeline.add("11:45 PM", "before midnight")
+    assert [event for _, event in timeline] == ["before midnight", "after midnight"]
+
+
+def test_crime_between_the_late_events_and_midnight():
+    times = [time for time, _ in build_case_timeline("11:50 PM")]
+    assert times == ["11:30 PM", "11:45 PM", "11:50 PM", "12:15 AM", "12:30 AM"]
+
+
+def test_evening_crime_comes_first():
+    times = [time for time, _ in build_case_timeline("08:10 PM")]
+    assert times == ["08:10 PM", "11:30 PM", "11:45 PM", "12:15 AM", "12:30 AM"]
@@ -0,0 +1,52 @@
+import glob
+import os
+import re
+import pandas as pd
+from crime_schema import CATEGORICAL_COLUMNS, INTEGER_COLUMNS, POOLED_TEXT_COLUMNS, apply_schema, bytes_per_row
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def generated_columns():
+    """Column names the game scripts write into their generated records ("Name": value)."""
+    names = set()
+    for path in glob.glob(os.path.join(REPO, "*.py")):
+        if os.path.basename(path) == "crime_schema.py":
+            continue
+        with open(path, encoding="utf-8") as f:
+            names.update(re.findall(r'"([A-Z]\w*)":', f.read()))
+    return names
+
+
+def test_every_schema_column_is_generated_somewhere():
+    missing = set(CATEGORICAL_COLUMNS) | set(INTEGER_COLUMNS) | set(POOLED_TEXT_COLUMNS)
+    assert missing - generated_columns() == set()
+
+
+def test_schema_columns_end_up_compact():
+    df = pd.DataFrame({name: ["a", "b", "a"] for name in CATEGORICAL_COLUMNS + POOLED_TEXT_COLUMNS})
+    for name in INTEGER_COLUMNS:
+        df[name] = [20, 30, 40]
+    apply_schema(df)
+    for name in CATEGORICAL_COLUMNS + POOLED_TEXT_COLUMNS:
+        assert isinstance(df[name].dtype, pd.CategoricalDtype), name
+    for name, dtype in INTEGER_COLUMNS.items():
+        assert df[name].dtype == dtype, name
+
+
+def test_schema_reduces_bytes_per_row():
+    rows = 1000
+    raw = pd.DataFrame({
+        "Location": ["Manjalpur", "Fatehgunj", "Gorwa", "Makarpura"] * (rows // 4),
+        "Crime_Type": ["Robbery", "Fraud"] * (rows // 2),
+        "Suspect_Gender": ["Male", "Female"] * (rows // 2),
+        "Suspect_Age": list(range(18, 43)) * (rows // 25),
+        "Time_Minutes": list(range(rows)),
+        "Crime_Scene_Evidence": ["Fingerprints found on the door handle."] * rows,
+    })
+    before = bytes_per_row(raw)
+    assert bytes_per_row(apply_schema(raw.copy())) < before
+
+
+def test_bytes_per_row_of_empty_frame():
+    assert bytes_per_row(pd.DataFrame({"Location": []})) == 0.0
@@ -0,0 +1,44 @@
+import streamlit as st
+
+# Served from ./static by Streamlit's static file serving (see .streamlit/config.toml).
+# The browser fetches and caches the stylesheet once; each rerun only sends the link tag.
+THEME_STYLESHEET = "app/static/theme.css"
+
+HOW_TO_PLAY = """
+1. Select a difficulty level.
+2. Analyze the crime data and use the hints provided.
+3. Guess the suspect's location, age, and gender.
+4. Submit your findings and see if you're correct!
+5. You have a limited number of attempts. Use them wisely!
+"""
+
+STORYLINE = """
+### 🕵️‍♂️ The Case of the Serial Suspect
+The city is in chaos! A series of crimes have been reported, and the police need your help to catch the suspects. 
+Use your statistical skills to analyze the data, interpret the clues, and identify the culprits. 
+Can you solve the case before time runs out?
+"""
+
+def apply_theme():
+    """Apply the Nature-inspired theme shared by the detective games."""
+    st.markdown(f'<link rel="stylesheet" href="{THEME_STYLESHEET}">', unsafe_allow_html=True)
+
+def show_how_to_play():
+    """Sidebar instructions shared by the location/age/gender guessing games."""
+    st.sidebar.header("How to Play")
+    st.sidebar.write(HOW_TO_PLAY)
+
+# The player's name lives under a plain session-state key, not the widget's: Streamlit
+# drops a widget's state on pages that do not render it, and the launcher keeps this key
+PLAYER_NAME_KEY = "_player_name"
+
+def _keep_player_name():
+    st.session_state[PLAYER_NAME_KEY] = st.session_state.player_name_input
+
+def player_name_input(label="Detective name (for the leaderboard)"):
+    """Sidebar name box shared by every game; returns the current name ("" if none)."""
+    st.sidebar.text_input(label, value=player_name(), key="player_name_input", on_change=_keep_player_name)
+    return player_name()
+
+def player_name():
+    return st.session_state.get(PLAYER_NAME_KEY, "")
@@ -5,6 +5,7 @@ import numpy as np
 import random
 from datetime import datetime, timedelta
 from scipy import stats
+from theme import apply_theme
 
 # Initialize Streamlit configuration first
 st.set_page_config(
@@ -15,55 +16,8 @@ st.set_page_config(
 
 os.environ["OMP_NUM_THREADS"] = "1"
 
-# Updated Nature-inspired Color Theme with original table styling
-st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f5f0e6;
-        color: #4f2022;
-        font-family: 'Helvetica Neue', sans-serif;
-    }
-    .stSelectbox div[data-baseweb="select"] > div {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border-radius: 5px !important;
-    }
-    .stSlider div[data-testid="stThumbValue"] {
-        color: #4f2022 !important;
-    }
-    .stSlider div[data-baseweb="slider"] {
-        background-color: transparent;
-    }
-    .stRadio div[role="radiogroup"] {
-        background-color: #ffffff !important;
-        padding: 10px;
-        border-radius: 5px;
-        border: 1px solid #9a816b;
-    }
-    .stButton>button {
-        background-color: #65b1df !important;
-        color: #ffffff !important;
-        border-radius: 8px;
-        padding: 10px 24px;
-        border: 2px solid #4f2022;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #4f2022 !important;
-        transform: scale(1.05);
-    }
-    .stSuccess {
-        background-color: #acdb01 !important;
-        color: #4f2022 !important;
-        border: 1px solid #9a816b;
-    }
-    .stError {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border: 1px solid #4f2022;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+# Nature-inspired theme (static stylesheet, see theme.py)
+apply_theme()
 
 
 
@@ -304,55 +258,6 @@ st.set_page_config(
 
 os.environ["OMP_NUM_THREADS"] = "1"
 
-# Updated Nature-inspired Color Theme with original table styling
-st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f5f0e6;
-        color: #4f2022;
-        font-family: 'Helvetica Neue', sans-serif;
-    }
-    .stSelectbox div[data-baseweb="select"] > div {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border-radius: 5px !important;
-    }
-    .stSlider div[data-testid="stThumbValue"] {
-        color: #4f2022 !important;
-    }
-    .stSlider div[data-baseweb="slider"] {
-        background-color: transparent;
-    }
-    .stRadio div[role="radiogroup"] {
-        background-color: #ffffff !important;
-        padding: 10px;
-        border-radius: 5px;
-        border: 1px solid #9a816b;
-    }
-    .stButton>button {
-        background-color: #65b1df !important;
-        color: #ffffff !important;
-        border-radius: 8px;
-        padding: 10px 24px;
-        border: 2px solid #4f2022;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #4f2022 !important;
-        transform: scale(1.05);
-    }
-    .stSuccess {
-        background-color: #acdb01 !important;
-        color: #4f2022 !important;
-        border: 1px solid #9a816b;
-    }
-    .stError {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border: 1px solid #4f2022;
-    }
-    </style>
-    """, unsafe_allow_html=True)
 
 st.title("🔍 Statistical Detective")
 st.write("*You are given the role of a Detective! Yay! Now, you have to use Statistics and Hints! Analyze the data, interpret the probabilities, and catch the suspect!*")
@@ -540,6 +445,7 @@ import numpy as np
 import random
 from datetime import datetime
 from sklearn.cluster import KMeans
+from theme import show_how_to_play, STORYLINE
 
 # Debug: Ensure Streamlit is properly imported
 try:
@@ -558,65 +464,9 @@ st.set_page_config(
 # Set environment variable for KMeans (to avoid warnings)
 os.environ["OMP_NUM_THREADS"] = "1"
 
-# Custom CSS for styling
-st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f5f0e6;
-        color: #4f2022;
-        font-family: 'Helvetica Neue', sans-serif;
-    }
-    .stSelectbox div[data-baseweb="select"] > div {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border-radius: 5px !important;
-    }
-    .stSlider div[data-testid="stThumbValue"] {
-        color: #4f2022 !important;
-    }
-    .stSlider div[data-baseweb="slider"] {
-        background-color: transparent;
-    }
-    .stRadio div[role="radiogroup"] {
-        background-color: #ffffff !important;
-        padding: 10px;
-        border-radius: 5px;
-        border: 1px solid #9a816b;
-    }
-    .stButton>button {
-        background-color: #65b1df !important;
-        color: #ffffff !important;
-        border-radius: 8px;
-        padding: 10px 24px;
-        border: 2px solid #4f2022;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #4f2022 !important;
-        transform: scale(1.05);
-    }
-    .stSuccess {
-        background-color: #acdb01 !important;
-        color: #4f2022 !important;
-        border: 1px solid #9a816b;
-    }
-    .stError {
-        background-color: #9a816b !important;
-        color: #ffffff !important;
-        border: 1px solid #4f2022;
-    }
-    </style>
-    """, unsafe_allow_html=True)
 
 # Sidebar for game instructions and status
-st.sidebar.header("How to Play")
-st.sidebar.write("""
-1. Select a difficulty level.
-2. Analyze the crime data and use the hints provided.
-3. Guess the suspect's location, age, and gender.
-4. Submit your findings and see if you're correct!
-5. You have a limited number of attempts. Use them wisely!
-""")
+show_how_to_play()
 
 # Initialize session state
 if "score" not in st.session_state:
@@ -634,12 +484,7 @@ if "show_correct_answer" not in st.session_state:
 
 # Game title and storyline
 st.title("🔍 Statistical Detective")
-st.write("""
-### 🕵️‍♂️ The Case of the Serial Suspect
-The city is in chaos! A series of crimes have been reported, and the police need your help to catch the suspects. 
-Use your statistical skills to analyze the data, interpret the clues, and identify the culprits. 
-Can you solve the case before time runs out?
-""")
+st.write(STORYLINE)
 
 # Difficulty settings
 difficulty_levels = {"Easy": 3, "Hard": 2, "Expert": 1}
@@ -760,67 +605,89 @@ st.header("🕵️ Investigation Toolkit")
 st.write(f"🔖 Age Range: The suspect is likely between {selected_case['Suspect_Age'] - 5} and {selected_case['Suspect_Age'] + 5} years old.")
 st.write(f"🔖 Location Analysis: A crime happened in this area that occurred during the {selected_case['Time_Period']}.")
 
-# Gradual hints based on attempts
-if st.session_state.hints_revealed >= 1:
-    st.write(f"🔖 Crime Type: The crime type is {selected_case['Crime_Type']}.")
-if st.session_state.hints_revealed >= 2:
-    st.write(f"🔖 Crime Scene Evidence: {selected_case['Crime_Scene_Evidence']}")
-
-# Investigation inputs
-col1, col2, col3 = st.columns(3)
-with col1:
-    guessed_location = st.selectbox("Crime Location", list(location_map.keys()), key="crime_location")
-with col2:
-    guessed_age = st.slider("Suspect Age", 18, 50, 30, key="suspect_age")
-with col3:
-    guessed_gender = st.radio("Suspect Gender", ["Male", "Female", "Other"], key="suspect_gender")
-
-guessed_gender = 0 if guessed_gender == "Male" else 1 if guessed_gender == "Female" else 2
-
-# Submit investigation
-if st.button("Submit Findings", type="primary"):
-    st.session_state.attempts -= 1
-    correct_location = guessed_location == selected_case["Location"]
-    correct_age = guessed_age == selected_case["Suspect_Age"]
-    correct_gender = guessed_gender == selected_case["Suspect_Gender"]
-    
-    if correct_location and correct_age and correct_gender:
-        st.success("🎉 Case Solved! You've identified the suspect! You win a sweet treat :)")
-        st.balloons()
-        st.session_state.score += 1  # Increase score
-        st.session_state.new_game = True  # Reset the game after solving the case
-    else:
-        feedback = []
-        if not correct_location:
-            feedback.append("📍 Location doesn't match.")
-        if abs(guessed_age - selected_case['Suspect_Age']) > 5:
-            feedback.append("📈 Age estimate significantly off.")
-        elif guessed_age != selected_case['Suspect_Age']:
-            feedback.append("📈 Age estimate close but not exact.")
-        if guessed_gender != selected_case['Suspect_Gender']:
-            feedback.append("👤 Gender mismatch.")
+# The guess inputs and the submit/feedback flow run as fragments: moving a widget
+# reruns only the guess panel and submitting reruns only the feedback panel, so
+# the dataset, clustering and crime table above are not re-executed.
+def rerun_app_if_case_ended():
+    # Case selection and the score live outside the fragments, so a finished case needs a full rerun
+    if st.session_state.new_game:
+        st.rerun()
+
+@st.fragment
+def guess_panel():
+    rerun_app_if_case_ended()
+    # Investigation inputs; the feedback panel reads them back through their keys
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.selectbox("Crime Location", list(location_map.keys()), key="crime_location")
+    with col2:
+        st.slider("Suspect Age", 18, 50, 30, key="suspect_age")
+    with col3:
+        st.radio("Suspect Gender", ["Male", "Female", "Other"], key="suspect_gender")
+
+@st.fragment
+def feedback_panel(selected_case, difficulty):
+    rerun_app_if_case_ended()
+
+    # Submit investigation
+    if st.button("Submit Findings", type="primary"):
+        guessed_location = st.session_state.crime_location
+        guessed_age = st.session_state.suspect_age
+        guessed_gender = st.session_state.suspect_gender
+        guessed_gender = 0 if guessed_gender == "Male" else 1 if guessed_gender == "Female" else 2
+
+        st.session_state.attempts -= 1
+        correct_location = guessed_location == selected_case["Location"]
+        correct_age = guessed_age == selected_case["Suspect_Age"]
+        correct_gender = guessed_gender == selected_case["Suspect_Gender"]
         
-        if st.session_state.attempts > 0:
-            st.error(f"🚨 Investigation Issues: {' • '.join(feedback)}")
-            st.session_state.hints_revealed += 1  # Reveal more hints
+        if correct_location and correct_age and correct_gender:
+            st.success("🎉 Case Solved! You've identified the suspect! You win a sweet treat :)")
+            st.balloons()
+            st.session_state.score += 1  # Increase score
+            st.session_state.new_game = True  # Reset the game after solving the case
         else:
-            st.session_state.show_correct_answer = True  # Show correct answer
-
-# Display correct answer if attempts are exhausted
-if st.session_state.show_correct_answer:
-    st.error("❌ Case Closed. No attempts left! The correct answer was:")
-    st.write(f"📍 Location: {selected_case['Location']}")
-    st.write(f"🔢 Age: {selected_case['Suspect_Age']}")
-    st.write(f"👤 Gender: {'Male' if selected_case['Suspect_Gender'] == 0 else 'Female' if selected_case['Suspect_Gender'] == 1 else 'Other'}")
-    st.session_state.new_game = True  # Reset the game after revealing the correct answer
-    st.session_state.attempts = difficulty_levels[difficulty]  # Reset attempts for the next game
-    st.session_state.show_correct_answer = False  # Reset correct answer display
-
-# Status bar
-st.caption(f"🔑 Difficulty: {difficulty} • 🔍 Attempts Left: {st.session_state.attempts}")
+            feedback = []
+            if not correct_location:
+                feedback.append("📍 Location doesn't match.")
+            if abs(guessed_age - selected_case['Suspect_Age']) > 5:
+                feedback.append("📈 Age estimate significantly off.")
+            elif guessed_age != selected_case['Suspect_Age']:
+                feedback.append("📈 Age estimate close but not exact.")
+            if guessed_gender != selected_case['Suspect_Gender']:
+                feedback.append("👤 Gender mismatch.")
+            
+            if st.session_state.attempts > 0:
+                st.error(f"🚨 Investigation Issues: {' • '.join(feedback)}")
+                st.session_state.hints_revealed += 1  # Reveal more hints
+            else:
+                st.session_state.show_correct_answer = True  # Show correct answer
+
+    # Gradual hints based on attempts
+    if st.session_state.hints_revealed >= 1:
+        st.write(f"🔖 Crime Type: The crime type is {selected_case['Crime_Type']}.")
+    if st.session_state.hints_revealed >= 2:
+        st.write(f"🔖 Crime Scene Evidence: {selected_case['Crime_Scene_Evidence']}")
+
+    # Display correct answer if attempts are exhausted
+    if st.session_state.show_correct_answer:
+        st.error("❌ Case Closed. No attempts left! The correct answer was:")
+        st.write(f"📍 Location: {selected_case['Location']}")
+        st.write(f"🔢 Age: {selected_case['Suspect_Age']}")
+        st.write(f"👤 Gender: {'Male' if selected_case['Suspect_Gender'] == 0 else 'Female' if selected_case['Suspect_Gender'] == 1 else 'Other'}")
+        st.session_state.new_game = True  # Reset the game after revealing the correct answer
+        st.session_state.attempts = difficulty_levels[difficulty]  # Reset attempts for the next game
+        st.session_state.show_correct_answer = False  # Reset correct answer display
+
+    # Status bar
+    st.caption(f"🔑 Difficulty: {difficulty} • 🔍 Attempts Left: {st.session_state.attempts}")
+
+guess_panel()
+feedback_panel(selected_case, difficulty)
 
 # New case button
 if st.button("🔄 Start New Case"):
     st.session_state.new_game = True
     st.session_state.hints_revealed = 0  # Reset hints for new case
     st.session_state.show_correct_answer = False  # Reset correct answer display
+    st.rerun()
@@ -0,0 +1,131 @@
+import fcntl
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+import numpy as np
+import seaborn as sns
+from item_bank import load_item_bank
+
+
+class ConfusionStats:
+    """Running answer counts for a waste-sorting item bank.
+
+    confusion[true category, chosen category] and item_choices[item, chosen
+    category] are integer arrays bumped in O(1) per submission. They hold only
+    this process's answers since its last snapshot: every snapshot_every
+    submissions, or snapshot_interval seconds, they are added to the totals in
+    <prefix>_confusion.npy and <prefix>_item_choices.npy under a file lock and
+    reset, so every server process contributes to the same totals. Charts are
+    drawn from those snapshots, so no view ever rescans the answer log.
+    """
+
+    def __init__(self, bank, prefix, snapshot_every=50, snapshot_interval=30.0):
+        self.bank = bank
+        self.confusion_path = f"{prefix}_confusion.npy"
+        self.item_choices_path = f"{prefix}_item_choices.npy"
+        self.lock_path = f"{prefix}.lock"
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        n_categories = len(bank.categories)
+        self.confusion = np.zeros((n_categories, n_categories), dtype=np.int64)
+        self.item_choices = np.zeros((len(bank.items), n_categories), dtype=np.int64)
+        self._unsaved = 0
+        self._last_snapshot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, waste_item, choice):
+        item = self.bank.item_ids[waste_item]
+        chosen = self.bank.categories.index(choice)
+        with self._lock:
+            self.confusion[self.bank.category_codes[item], chosen] += 1
+            self.item_choices[item, chosen] += 1
+            self._unsaved += 1
+            due = (self._unsaved >= self.snapshot_every
+                   or time.monotonic() - self._last_snapshot >= self.snapshot_interval)
+        if due:
+            self.snapshot()
+
+    def snapshot(self):
+        """Add the counts since the last snapshot to the shared totals, if there are any."""
+        with self._lock:
+            if not self._unsaved:
+                return
+            deltas = (self.confusion.copy(), self.item_choices.copy())
+            self.confusion[:] = 0
+            self.item_choices[:] = 0
+            self._unsaved = 0
+            self._last_snapshot = time.monotonic()
+        try:
+            self._merge(deltas)
+        except OSError:
+            # Keep the counts for the next snapshot rather than losing them
+            with self._lock:
+                self.confusion += deltas[0]
+                self.item_choices += deltas[1]
+                self._unsaved += 1
+            raise
+
+    def _merge(self, deltas):
+        paths = (self.confusion_path, self.item_choices_path)
+        with open(self.lock_path, "a") as lock:
+            # Held across read, add and write, so concurrent processes never drop each other's counts
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            totals = [_load_counts(path, delta.shape) + delta for path, delta in zip(paths, deltas)]
+            for path, array in zip(paths, totals):
+                # Write a private temporary file, then rename, so readers never see a half-written snapshot
+                fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".npy.tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.save(f, array)
+                    os.replace(temporary, path)
+                except BaseException:
+                    os.remove(temporary)
+                    raise
+
+    def snapshot_version(self):
+        """Changes whenever a new snapshot is written; None before the first one."""
+        try:
+            return os.stat(self.item_choices_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+def _load_counts(path, shape):
+    # Totals from an earlier bank with a different shape are started over
+    try:
+        counts = np.load(path)
+    except FileNotFoundError:
+        return np.zeros(shape, dtype=np.int64)
+    return counts if counts.shape == shape else np.zeros(shape, dtype=np.int64)
+
+@lru_cache(maxsize=None)
+def get_confusion_stats(bank_name, prefix="waste_stats"):
+    """The process-wide counters for an item bank."""
+    return ConfusionStats(load_item_bank(bank_name), f"{prefix}_{bank_name}")
+
+def draw_confusion_heatmap(stats):
+    """draw(fig, ax) for chart_cache: row-normalised confusion heatmap read from the snapshot."""
+    def draw(fig, ax):
+        confusion = np.load(stats.confusion_path)
+        totals = confusion.sum(axis=1, keepdims=True)
+        shares = np.divide(confusion, totals, out=np.zeros(confusion.shape), where=totals > 0) * 100
+        sns.heatmap(shares, annot=True, fmt=".0f", cmap="Greens", vmin=0, vmax=100, ax=ax,
+                    xticklabels=stats.bank.categories, yticklabels=stats.bank.categories,
+                    cbar_kws={"label": "% of answers"})
+        ax.set_xlabel("Player's choice")
+        ax.set_ylabel("Correct category")
+    return draw
+
+def draw_item_accuracy(stats):
+    """draw(fig, ax) for chart_cache: per-item accuracy read from the snapshot."""
+    def draw(fig, ax):
+        item_choices = np.load(stats.item_choices_path)
+        seen = item_choices.sum(axis=1)
+        correct = item_choices[np.arange(len(seen)), stats.bank.category_codes]
+        answered = np.flatnonzero(seen)
+        accuracy = correct[answered] / seen[answered] * 100
+        sns.barplot(x=accuracy, y=[stats.bank.items[i] for i in answered], color="seagreen", ax=ax)
+        ax.set_xlabel("Accuracy (%)")
+        ax.set_ylabel("")
+    return draw